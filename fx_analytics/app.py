@@ -5,13 +5,34 @@ import numpy as np
 import datetime as datetime
 from pandas.core.series import Series
 import streamlit as st
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.graph_objs import Figure
 from loguru import logger
 from fx_analytics.main_functions import setup_logging
 from fx_analytics import config
-from typing import List, Dict, Any
+from fx_analytics.currency import CURRENCY_SYMBOLS, convert_to_reporting_currency, load_rate_table, needs_conversion
+from fx_analytics.data_store import data_version
+from fx_analytics.out_of_core import aggregate_deals, count_trades
+from fx_analytics.execution import execution_quality
+from fx_analytics.figure_cache import cached_spec, figure_from_spec
+from fx_analytics.deal_explorer import DEAL_TYPES, SORTABLE_COLUMNS, build_deal_index, query_deals
+from fx_analytics.monte_carlo import daily_returns, simulate_equity_paths, simulation_summary, trade_returns
+from fx_analytics.periods import FREQUENCIES, period_growth
+from fx_analytics.rollups import ALL_SYMBOLS, build_symbol_rollups
+from fx_analytics.segment_store import aggregate_store, store_version
+from fx_analytics.trade_stats import trade_statistics
+from fx_analytics.time_analytics import add_time_buckets, time_pnl_tables
+from fx_analytics.watcher import deal_snapshot, open_deal_tail, refresh_deal_tail
+from typing import List, Dict, Any, Optional, Tuple
+
+# x-axis titles of the period growth charts
+PERIOD_AXIS_TITLES = {'daily': "Date", 'weekly': "Week", 'monthly': "month", 'quarterly': "Quarter", 'yearly': "Year"}
+
+# version of the chart builders, part of the figure cache key: bump it when a chart changes so
+# specs cached on disk by an older build are not served
+CHART_SCHEMA = 1
 
 # functions!
 
@@ -145,6 +166,24 @@ def profit_over_time(dataframe: pd.DataFrame,
 
     return fig
 
+def count_deals(df: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """
+    Count deals per group.
+
+    Works on raw deals (one row per deal) as well as on the aggregate of the bounded-memory
+    mode, whose rows carry the number of deals they stand for in a 'deals' column.
+
+    Args:
+        df (pd.DataFrame): Raw or aggregated deals.
+        by (List[str]): The columns to group by.
+
+    Returns:
+        pd.DataFrame: The group columns and a 'count' column.
+    """
+    if 'deals' in df.columns:
+        return df.groupby(by=by)['deals'].sum().reset_index(name='count')
+    return df.groupby(by=by).size().reset_index(name='count')
+
 def plot_piechart(df):
     """
     Create a pie chart to visualize the distribution of symbols in a DataFrame.
@@ -174,7 +213,7 @@ def plot_piechart(df):
     df_sym = df.loc[df['type'] != 2]
 
     # Group symbols and count their occurrences
-    commodity = df_sym.groupby(by=['symbol']).size().reset_index(name='count')
+    commodity = count_deals(df_sym, ['symbol'])
 
     # Create a pie chart using Plotly Express
     fig = px.pie(commodity, 
@@ -209,7 +248,7 @@ def daily_commodities_trade_pie_chart(df: pd.DataFrame, create_symbol_count_data
     df_sym = df.loc[df['type'] == 0]
 
     # Group by 'date' and 'symbol' and count occurrences
-    commodity = df_sym.groupby(by=['date','symbol']).size().reset_index(name='count')
+    commodity = count_deals(df_sym, ['date','symbol'])
 
     # Further group by 'date' and create lists of 'symbols' and their corresponding 'count'
     commodity = commodity.groupby('date').agg({'symbol': list, 'count': list}).reset_index()
@@ -270,8 +309,13 @@ def total_trades(df: pd.DataFrame) -> int:
     """
     Calculate the total number of unique trades in a DataFrame.
 
+    A trade is a position opened in the history: a buy or sell deal with entry in (see
+    `out_of_core.count_trades`, which the bounded-memory mode uses chunk by chunk). Files
+    without an 'entry' column count the unique positions with a buy deal.
+
     Args:
-        df (pd.DataFrame): A DataFrame containing trading data with a 'type' column.
+        df (pd.DataFrame): A DataFrame containing trading data with a 'type' column, and
+                           'entry' or 'position_id'.
 
     Returns:
         int: The total number of unique trades.
@@ -288,6 +332,9 @@ def total_trades(df: pd.DataFrame) -> int:
     Output:
         3
     """
+    if 'entry' in df.columns:
+        return count_trades(df)
+
     # create a copy of the dataframe
     df = df.copy()
 
@@ -369,137 +416,182 @@ def extract_latest_pip_growth(data: pd.DataFrame) -> pd.DataFrame:
     return df_pip_latest
 
 
-def create_growth_chart(df: pd.DataFrame, weeklygrowth: bool = True) -> Figure:
+def plot_period_growth(period_df: pd.DataFrame, frequency: str = 'weekly') -> Figure:
+    """
+    Create a growth bar chart from one frequency table of the period engine.
+
+    Args:
+        period_df (DataFrame): A table returned by `periods.period_growth`, with 'label',
+                               'total_profit' and 'color' columns.
+        frequency (str): The frequency of period_df, one of periods.FREQUENCIES.
+
+    Returns:
+        Figure: A Plotly Figure object representing the growth chart.
+    """
+    # Create the bar chart
+    fig = go.Figure(data=[go.Bar(
+        x=period_df['label'],
+        y=period_df['total_profit'],
+        marker_color=period_df['color'],  # Set the bar color based on the 'color' column
+    )])
+    # Customize the chart appearance
+    fig.update_layout(
+        title=f"{frequency.capitalize()} Growth",
+        xaxis_title=PERIOD_AXIS_TITLES[frequency],
+        yaxis_title="Profit",
+        xaxis_type='category',
+        width=475,
+        height=375
+    )
+
+    return fig
+
+def create_growth_chart(df: pd.DataFrame, weeklygrowth: bool = True, frequency: str = None) -> Figure:
     """
     Create and display a weekly and monthly growth bar chart from a DataFrame.
 
     Args:
         df (DataFrame): The DataFrame containing the data with 'date', 'type', and 'profit' columns.
+        weeklygrowth (bool): Weekly chart if True, monthly chart otherwise.
+        frequency (str, optional): Any of periods.FREQUENCIES; overrides weeklygrowth.
 
     Returns:
         Figure: A Plotly Figure object representing the weekly growth chart.
     """
-    # create a copy of the dataframe
-    df = df.copy()
-    # Convert the 'date' column to DateTime
-    df['date'] = pd.to_datetime(df['date'])
+    frequency = frequency or ('weekly' if weeklygrowth else 'monthly')
 
-    # Filter the DataFrame by 'type' column
-    result_df = df.loc[df['type'] != 2]
-
-    # Calculating total profit 
-    result_df.loc[:, 'total_profit'] = result_df['profit'] + result_df['swap'] + result_df['commission'] + result_df['fee']
-    # Extract week and month
-    result_df.loc[:,'week'] = result_df['date'].dt.isocalendar().week
-    result_df['week'] = result_df['week'].astype('int32')
-    result_df.loc[:,'month'] = result_df['date'].dt.month
-    result_df.loc[:,'year'] = result_df['date'].dt.year
-    result_df.loc[:,'week-year'] = result_df['week'].astype(str) + '-' + result_df['year'].astype(str)
-    result_df.loc[:,'month-year'] = result_df['month'].astype(str) + '-' + result_df['year'].astype(str)
-
-    if weeklygrowth == True:
-        # Calculate weekly growth
-        weekly_growth = result_df.groupby(by=['week-year','month','year'])['total_profit'].sum().reset_index()
-        weekly_growth.loc[:,'color'] = weekly_growth['total_profit'].apply(lambda x: 'green' if x >= 0 else 'red')
-        weekly_growth = weekly_growth.sort_values(by=['year','month'], ascending=True)
-
-        # Create the bar chart
-        fig = go.Figure(data=[go.Bar(
-            x=weekly_growth['week'],
-            y=weekly_growth['total_profit'],
-            marker_color=weekly_growth['color'],  # Set the bar color based on the 'color' column
-        )])
-            # Customize the chart appearance
-        fig.update_layout(
-            title="Weekly Growth",
-            xaxis_title="Week",
-            yaxis_title="Profit",
-            width=475,
-            height=375
-        )
+    return plot_period_growth(period_growth(df, [frequency])[frequency], frequency)
 
-    else:
-        # Calculate monthly growth
-        monthly_growth = result_df.groupby(by=['month-year','month','year'])['total_profit'].sum().reset_index()
-        monthly_growth.loc[:,'color'] = monthly_growth['total_profit'].apply(lambda x: 'green' if x >= 0 else 'red')
-        monthly_growth = monthly_growth.sort_values(by=['year','month'], ascending=True)
-
-        # Create the bar chart
-        fig = go.Figure(data=[go.Bar(
-            x=monthly_growth['month'],
-            y=monthly_growth['total_profit'],
-            marker_color=monthly_growth['color'],  # Set the bar color based on the 'color' column
-        )])
-        # Customize the chart appearance
-        fig.update_layout(
-            title="Monthly Growth",
-            xaxis_title="month",
-            yaxis_title="Profit",
-            width=475,
-            height=375
-        )
+def plot_pnl_heatmap(table: pd.DataFrame, title: str, yaxis_title: str) -> Figure:
+    """
+    Create a red/green heatmap of P&L, e.g. the calendar or the hour x weekday matrix
+    returned by `time_pnl_tables`.
+
+    Args:
+        table (pd.DataFrame): P&L with the heatmap rows as index and weekdays as columns.
+        title (str): The title of the plot.
+        yaxis_title (str): The title of the y-axis.
+
+    Returns:
+        Figure: A Plotly figure representing the heatmap.
+    """
+    # Center the colour scale on zero so losses are red and profits green
+    limit = np.nanmax(np.abs(table.to_numpy())) if table.size else 1
+
+    fig = go.Figure(data=go.Heatmap(
+        z=table.to_numpy(),
+        x=table.columns,
+        y=[str(label.date()) if hasattr(label, 'date') else label for label in table.index],
+        colorscale='RdYlGn',
+        zmid=0,
+        zmin=-limit,
+        zmax=limit,
+        hoverongaps=False,
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Weekday",
+        yaxis_title=yaxis_title,
+        yaxis_type='category',
+        width=550,
+        height=450
+    )
 
     return fig
 
-def weekly_percentage_growth(df: pd.DataFrame) -> pd.DataFrame:
+def plot_quantiles_by_hour(table: pd.DataFrame, column: str, title: str, yaxis_title: str) -> Figure:
     """
-    Calculate weekly percentage growth and various related metrics.
+    Create a grouped bar chart of the quantiles of a distribution per hour, e.g. the slippage
+    or fill latency tables returned by `execution_quality`.
 
-    Parameters:
-    - df (pandas.DataFrame): DataFrame containing at least the columns ['date', 'type', 'profit', 'swap', 'commission', 'fee']
+    Args:
+        table (pd.DataFrame): Distribution table indexed by hour, with '<column>_p<q>' columns.
+        column (str): The measure to plot, e.g. 'latency_ms'.
+        title (str): The title of the plot.
+        yaxis_title (str): The title of the y-axis.
 
     Returns:
-    - pandas.DataFrame: DataFrame with weekly percentage growth and related metrics.
+        Figure: A Plotly figure with one bar per hour and quantile.
     """
-        # create a copy of the dataframe
-    df = df.copy()
-    
-    # Convert 'date' column to datetime format
-    df['date'] = pd.to_datetime(df['date'])
+    fig = go.Figure()
+    for quantile in [c for c in table.columns if c.startswith(f"{column}_p")]:
+        fig.add_trace(go.Bar(x=table.index, y=table[quantile], name=quantile.rsplit('_', 1)[1]))
 
-    # Calculate total deposits based on type==2 and store in variable
-    deposit  = sum(df.loc[df.type == 2].profit.tolist())
-    
-    # Filter out rows where type is 2
-    df = df.loc[df['type'] != 2]
-    
-    # Add a 'week' column with the week number of the year
-    df['week'] = df['date'].dt.isocalendar().week
-    
-    # Add a 'month' column with the month of the date
-    df['month'] = df['date'].dt.month
-    
-    # Add a 'year' column with the year of the date
-    df['year'] = df['date'].dt.year
-    
-    # Calculate the total profit by adding the profit, swap, commission, and fee columns
-    df.loc[:, 'total_profit'] = df['profit'] + df['swap'] + df['commission'] + df['fee']
-    
-    # Group by week, month, and year and sum the total profit for each group
-    df_weekly_percentage_growth = df.groupby(by=['week', 'month', 'year'])['total_profit'].sum().reset_index()
-    
-    # Calculate the cumulative weekly growth
-    df_weekly_percentage_growth.loc[:, 'cummulative_weekly_growth'] = df_weekly_percentage_growth['total_profit'].cumsum()
-    
-    # Calculate the daily balance by adding deposit to cumulative weekly growth
-    df_weekly_percentage_growth.loc[:, 'weekly_balance'] =  deposit + df_weekly_percentage_growth['cummulative_weekly_growth']
+    fig.update_layout(
+        title=title,
+        xaxis_title="Hour",
+        yaxis_title=yaxis_title,
+        barmode='group',
+        width=550,
+        height=450
+    )
+
+    return fig
+
+def plot_simulated_paths(sample_paths: np.ndarray, title: str = "Simulated Equity Paths", currency_symbol: str = "€") -> Figure:
+    """
+    Create a line plot of simulated equity paths with their median.
+
+    Args:
+        sample_paths (np.ndarray): Paths x steps matrix of balances, see `monte_carlo.simulate_equity_paths`.
+        title (str, optional): The title of the plot.
+        currency_symbol (str, optional): Currency shown on the y-axis. Default is "€".
+
+    Returns:
+        Figure: A Plotly figure with one faint line per path and the median path.
+    """
+    fig = go.Figure()
+    steps = np.arange(sample_paths.shape[1])
+
+    # One faint line per sampled path
+    for path in sample_paths:
+        fig.add_trace(go.Scatter(x=steps, y=path, mode='lines', line=dict(width=1, color='rgba(99, 110, 250, 0.15)'),
+                                 hoverinfo='skip', showlegend=False))
+
+    fig.add_trace(go.Scatter(x=steps, y=np.median(sample_paths, axis=0), mode='lines', line=dict(width=3), name='Median'))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Step",
+        yaxis_title=f"Balance ({currency_symbol})",
+        showlegend=True,
+        width=700,
+        height=450
+    )
+
+    return fig
 
-    # Sort the DataFrame by year, month, and week in descending order
-    df_weekly_percentage_growth = df_weekly_percentage_growth.sort_values(by=['year', 'month', 'week'], ascending=False)
+def percentage_growth(df: pd.DataFrame, frequency: str) -> pd.DataFrame:
+    """
+    Calculate the percentage growth of the two latest periods of a frequency.
 
-    # shifting the dataframe by 1 week to calculate weekly growth
-    df_weekly_percentage_growth['weekly_profit_shift1'] = df_weekly_percentage_growth['total_profit'].shift(1)
+    Parameters:
+    - df (pandas.DataFrame): DataFrame containing at least the columns ['date', 'type', 'profit', 'swap', 'commission', 'fee']
+    - frequency (str): One of periods.FREQUENCIES.
 
-    # after shifting the dataframe by week 1, the first row contains NaN value , so we need to drop it
-    df_weekly_percentage_growth = df_weekly_percentage_growth.dropna()
+    Returns:
+    - pandas.DataFrame: The latest two periods, newest first, with the period engine columns and
+                        the growth renamed to '{frequency}_growth_%' (profit relative to the balance
+                        at the start of the period).
+    """
+    table = period_growth(df, [frequency])[frequency]
 
-    # calculating weekly growth by taking ratio of weekly profit to last week revenue!
-    df_weekly_percentage_growth['weekly_growth_%'] = round((df_weekly_percentage_growth['weekly_profit_shift1'] / df_weekly_percentage_growth['weekly_balance']),3)*100
+    # Newest period first, only the current and the previous one
+    table = table.rename(columns={'growth_%': f'{frequency}_growth_%', 'balance': f'{frequency}_balance'})
 
-    # Slice the DataFrame to get the first two rows
-    df_weekly_percentage_growth = df_weekly_percentage_growth.iloc[:2]
+    return table.iloc[::-1].iloc[:2].reset_index(drop=True)
 
-    return df_weekly_percentage_growth
+def weekly_percentage_growth(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate weekly percentage growth and various related metrics.
+
+    Parameters:
+    - df (pandas.DataFrame): DataFrame containing at least the columns ['date', 'type', 'profit', 'swap', 'commission', 'fee']
+
+    Returns:
+    - pandas.DataFrame: DataFrame with weekly percentage growth and related metrics.
+    """
+    return percentage_growth(df, 'weekly')
 
 def monthly_percentage_growth(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -511,52 +603,434 @@ def monthly_percentage_growth(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
     - pandas.DataFrame: A DataFrame with monthly percentage growth and related metrics.
     """
-    # create a copy of the dataframe
-    df = df.copy()
-    
-    # Convert 'date' column to datetime format
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Calculate total deposits based on type==2 and store in variable
-    deposit = sum(df.loc[df.type == 2].profit.tolist())
-    
-    # Filter out rows where type is 2
-    df = df.loc[df['type'] != 2].copy()  # using .copy() to avoid SettingWithCopyWarning
-    
-    # Extract month and year from the 'date' column and create respective columns
-    df.loc[:,'month'] = df['date'].dt.month
-    df.loc[:,'year'] = df['date'].dt.year
-    
-    # Calculate the total profit by adding the profit, swap, commission, and fee columns
-    df.loc[:, 'total_profit'] = df['profit'] + df['swap'] + df['commission'] + df['fee']
-    
-    # Group by month and year, then sum the total profit for each group
-    df_month_percentage_growth = df.groupby(by=['month', 'year'])['total_profit'].sum().reset_index()
-    
-    # Calculate the cumulative monthly growth
-    df_month_percentage_growth.loc[:, 'cummulative_monthly_growth'] = df_month_percentage_growth['total_profit'].cumsum()
-    
-    # Calculate the daily balance by adding deposit to cumulative monthly growth
-    df_month_percentage_growth.loc[:, 'monthly_balance'] =  deposit + df_month_percentage_growth['cummulative_monthly_growth']
-    
-    # Sort the DataFrame by year and month in descending order
-    df_month_percentage_growth = df_month_percentage_growth.sort_values(by=['year', 'month'], ascending=False)
+    return percentage_growth(df, 'monthly')
 
-    # shifting the dataframe by 1 month to calculate weekly growth
-    df_month_percentage_growth['monthly_profit_shift1'] = df_month_percentage_growth['total_profit'].shift(1)
+@st.cache_resource
+def load_deal_tail(data_file_path: str) -> Dict:
+    """
+    Read the deal file once and keep the tail-reading watcher state for later appends.
+    """
+    return open_deal_tail(data_file_path)
 
-    # after shifting the dataframe by month 1, the first row contains NaN value , so we need to drop it
-    df_month_percentage_growth = df_month_percentage_growth.dropna()
-    
-    # calculating weekly growth by taking ratio of weekly profit to last week revenue!
-    df_month_percentage_growth['monthly_growth_%'] = round((df_month_percentage_growth['monthly_profit_shift1'] / df_month_percentage_growth['monthly_balance']),3)*100
+@st.cache_resource(max_entries=4)
+def load_deal_snapshot(data_file_path: str, version: str, _frame: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Return the raw deals of a data version of the watcher.
+
+    `current_version` stores the frame of every version it returns (`_frame` is not part of
+    the cache key), so every panel of a run reads the deals of the version it is keyed on,
+    even when the watcher merged newer deals in the meantime.
+    """
+    if _frame is None:
+        latest, _frame = deal_snapshot(load_deal_tail(data_file_path))
+        if latest != version:
+            # the deals of this version are gone: start over with the latest version
+            st.rerun()
+    return _frame
+
+def load_deals(data_file_path: str, version: str, currency: str = config.ACCOUNT_CURRENCY, rates: Optional[str] = None) -> pd.DataFrame:
+    """
+    Return the deals held by the watcher state, in the reporting currency. The returned
+    DataFrame is shared between reruns and sessions and must not be modified in place.
+    """
+    return load_frame(data_file_path, version, False, currency, rates)
+
+def current_version(data_file_path: str, out_of_core: bool) -> str:
+    """
+    Merge newly appended deals into the cached deals and return the current data version.
+
+    In bounded-memory mode the raw deals are not kept, so the version is taken from the file
+    (or the manifest of a segmented store) and a change re-streams the file.
+    """
+    if os.path.isdir(data_file_path):
+        return store_version(data_file_path)
+    if out_of_core:
+        return data_version(data_file_path)
+    tail = load_deal_tail(data_file_path)
+    refresh_deal_tail(tail)
+    version, frame = deal_snapshot(tail)
+    load_deal_snapshot(data_file_path, version, frame)
+    return version
+
+@st.fragment(run_every=config.REFRESH_INTERVAL)
+def watch_deal_file(data_file_path: str, version: str, out_of_core: bool) -> None:
+    """
+    Check the deal file every config.REFRESH_INTERVAL seconds and rerun the dashboard when
+    deals were appended, so idle viewers pick up new deals without a manual reload.
+    """
+    if current_version(data_file_path, out_of_core) != version:
+        logger.info("New deals detected, refreshing the dashboard")
+        st.rerun()
+
+@st.cache_resource(max_entries=2)
+def load_aggregated_deals(data_file_path: str, version: str, chunksize: int) -> Tuple[pd.DataFrame, int]:
+    """
+    Stream the deal file, or the segments and rollups of a segmented store, into the
+    bounded-memory aggregate once per data version.
+    """
+    if os.path.isdir(data_file_path):
+        return aggregate_store(data_file_path)
+    return aggregate_deals(data_file_path, chunksize)
+
+@st.cache_resource
+def load_rates(version: str) -> pd.DataFrame:
+    """
+    Read the local rate table once per version of the rate file.
+    """
+    return load_rate_table(config.FX_RATES_PATH)
+
+def rates_version() -> str:
+    """
+    Return the version of the local rate table, or None if there is no rate table.
+    """
+    return data_version(config.FX_RATES_PATH) if os.path.isfile(config.FX_RATES_PATH) else None
+
+def _unconverted_frame(data_file_path: str, version: str, out_of_core: bool) -> pd.DataFrame:
+    if out_of_core:
+        return load_aggregated_deals(data_file_path, version, config.CHUNK_SIZE)[0]
+    return load_deal_snapshot(data_file_path, version)
+
+@st.cache_resource(max_entries=4)
+def load_converted_frame(data_file_path: str, version: str, out_of_core: bool, currency: str, rates: str) -> pd.DataFrame:
+    """
+    Convert the deals into the reporting currency once per data version, rate table version
+    and currency, so that all panels reuse the converted columns.
+    """
+    frame = _unconverted_frame(data_file_path, version, out_of_core)
+    return convert_to_reporting_currency(frame, load_rates(rates), currency)
+
+def load_frame(data_file_path: str, version: str, out_of_core: bool, currency: str = config.ACCOUNT_CURRENCY,
+               rates: Optional[str] = None) -> pd.DataFrame:
+    """
+    Return the frame the dashboard panels are computed from: the raw deals, or their
+    aggregate in bounded-memory mode, converted into the reporting currency with the rate
+    table of version `rates` (see `rates_version`). Without a rate table the amounts are
+    returned unconverted.
+
+    Every cached loader built on this frame takes `rates` as a parameter, so a new rate table
+    invalidates it like new deals do.
+    """
+    frame = _unconverted_frame(data_file_path, version, out_of_core)
+    if rates is None or not needs_conversion(frame, currency):
+        return frame
+    return load_converted_frame(data_file_path, version, out_of_core, currency, rates)
+
+@st.cache_resource(max_entries=2)
+def load_deal_index(data_file_path: str, version: str, currency: str = config.ACCOUNT_CURRENCY, rates: Optional[str] = None) -> Dict:
+    """
+    Build the deal explorer index once per data version and rate table version.
+    """
+    return build_deal_index(load_deals(data_file_path, version, currency, rates))
+
+@st.cache_resource(max_entries=2)
+def load_symbol_rollups(data_file_path: str, version: str, out_of_core: bool = False, currency: str = config.ACCOUNT_CURRENCY,
+                        rates: Optional[str] = None) -> Dict:
+    """
+    Precompute the per-symbol row indices and panel rollups once per data version and rate table version.
+    """
+    return build_symbol_rollups(load_frame(data_file_path, version, out_of_core, currency, rates))
+
+@st.cache_data(max_entries=config.FIGURE_CACHE_SIZE)
+def load_chart(data_file_path: str, version: str, out_of_core: bool, currency: str, rates: Optional[str], symbol: str, chart: str,
+               frequency: str = None) -> Dict:
+    """
+    Build a figure of the bottom panels once per data version and view parameters.
+
+    Figures are kept as serialized specs, in memory with LRU eviction (every session gets its
+    own copy) and, if config.FIGURE_CACHE_DIR is set, on disk, so reruns and restarts render
+    them without rebuilding. The key includes CHART_SCHEMA and the Plotly version, so specs
+    cached by another build are not served. Render the spec with `figure_from_spec`.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+        version (str): The data version of the deal file.
+        out_of_core (bool): Whether the dashboard runs in bounded-memory mode.
+        currency (str): The reporting currency.
+        rates (str, optional): The version of the rate table, see `rates_version`.
+        symbol (str): The selected symbol, or ALL_SYMBOLS.
+        chart (str): One of 'growth', 'profit', 'trades', 'daily_pie', 'total_pie' and 'period'.
+        frequency (str, optional): The period frequency of the 'period' chart.
+
+    Returns:
+        Dict: The figure spec.
+    """
+    def build() -> Figure:
+        cur = CURRENCY_SYMBOLS.get(currency, currency)
+        view = load_symbol_rollups(data_file_path, version, out_of_core, currency, rates)['views'][symbol]
+
+        if chart == 'growth' and symbol == ALL_SYMBOLS:
+            return plot_growth_over_time(view['growth'], 'date', 'growth', title="Growth Over Time", yaxis_title= f'Daily_Portfolio ({cur})')
+        if chart == 'growth':
+            return plot_growth_over_time(view['growth'], 'date', 'growth', title=f"{symbol} Cumulative P&L", yaxis_title= f'Cumulative P&L ({cur})')
+        if chart == 'profit':
+            return profit_over_time(view['profit'], 'date', 'growth', title="Daily Profit", yaxis_title= f'Daily Profit ({cur})')
+        if chart == 'trades':
+            return profit_over_time(view['trades'], 'date', 'count', title="Daily Number of Trade!", yaxis_title= 'Daily Number of Trades Taken')
+        if chart == 'period':
+            return plot_period_growth(view['periods'][frequency], frequency)
+
+        df = load_frame(data_file_path, version, out_of_core, currency, rates)
+        if chart == 'daily_pie':
+            return daily_commodities_trade_pie_chart(df, create_symbol_count_dataframe)
+        if chart == 'total_pie':
+            return plot_piechart(df)
+        raise ValueError(f"Unknown chart {chart!r}")
+
+    return cached_spec(build, schema=CHART_SCHEMA, plotly=plotly.__version__, data_file_path=os.path.abspath(data_file_path),
+                       version=version, out_of_core=out_of_core, currency=currency, rates=rates, symbol=symbol,
+                       chart=chart, frequency=frequency)
+
+@st.cache_resource(max_entries=2)
+def load_time_tables(data_file_path: str, version: str, out_of_core: bool = False, currency: str = config.ACCOUNT_CURRENCY,
+                     rates: Optional[str] = None) -> Dict:
+    """
+    Compute the calendar and time-of-day P&L tables once per data version and rate table version.
+    """
+    df = load_frame(data_file_path, version, out_of_core, currency, rates)
+    # files written before the bucket columns were added still carry the full 'time'
+    if 'weekday' not in df.columns:
+        df = add_time_buckets(df)
+    return time_pnl_tables(df)
+
+def time_of_day_analytics(data_file_path: str, version: str, out_of_core: bool = False, currency: str = config.ACCOUNT_CURRENCY,
+                          rates: Optional[str] = None) -> None:
+    """
+    Render the calendar P&L heatmap and the hour x weekday and session P&L panels.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+        version (str): The data version of the deal file.
+        out_of_core (bool): Whether the dashboard runs in bounded-memory mode.
+        currency (str): The reporting currency.
+        rates (str, optional): The version of the rate table, see `rates_version`.
+    """
+    tables = load_time_tables(data_file_path, version, out_of_core, currency, rates)
 
-    # Slice the DataFrame to get the first two rows
-    df_month_cum_growth = df_month_percentage_growth.iloc[:2]
+    CalendarPlot, HourPlot = st.columns(2)
 
-    return df_month_cum_growth
+    with CalendarPlot:
+        calendar = plot_pnl_heatmap(tables['calendar'], title="Calendar P&L", yaxis_title="Week")
+        st.plotly_chart(calendar)
 
-def main(data_file_path:str):
+    with HourPlot:
+        if tables['hour_weekday'] is None:
+            st.info("The deal file has no intraday time, so hour and session analytics are unavailable.")
+        else:
+            hour_weekday = plot_pnl_heatmap(tables['hour_weekday'], title="P&L by Hour and Weekday", yaxis_title="Hour")
+            st.plotly_chart(hour_weekday)
+
+    if tables['session'] is not None:
+        session_plot = profit_over_time(tables['session'], 'session', 'profit', title="P&L by Trading Session", yaxis_title=f'Profit ({CURRENCY_SYMBOLS.get(currency, currency)})')
+        session_plot.update_layout(xaxis_title="Session")
+        st.plotly_chart(session_plot)
+
+@st.cache_data(max_entries=8)
+def run_simulation(data_file_path: str, version: str, currency: str, rates: Optional[str], basis: str, n_paths: int, horizon: int, seed: int) -> Dict:
+    """
+    Run the Monte Carlo simulation once per data version, rate table version and parameter set.
+    """
+    df = load_deals(data_file_path, version, currency, rates)
+    returns = daily_returns(df) if basis == 'daily' else trade_returns(df)
+    start_balance = period_growth(df, ['daily'])['daily']['balance'].iloc[-1]
+
+    result = simulate_equity_paths(returns, start_balance, n_paths=n_paths, horizon=horizon, seed=seed)
+    return {'summary': simulation_summary(result), 'sample_paths': result['sample_paths'], 'returns': len(returns)}
+
+def monte_carlo_simulation(data_file_path: str, version: str, currency: str = config.ACCOUNT_CURRENCY, rates: Optional[str] = None) -> None:
+    """
+    Render the Monte Carlo panel: bootstrapped equity paths starting from the current balance,
+    with terminal-balance and drawdown percentiles.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+        version (str): The data version of the deal file.
+        currency (str): The reporting currency.
+        rates (str, optional): The version of the rate table, see `rates_version`.
+    """
+    Basis, Paths, Horizon, Seed = st.columns(4)
+
+    with Basis:
+        basis = st.radio("Resample", ['daily', 'trade'], format_func=lambda b: f"{b} returns", horizontal=True)
+    with Paths:
+        n_paths = st.number_input("Paths", min_value=100, max_value=200_000, value=config.MC_PATHS, step=1_000)
+    with Horizon:
+        horizon = st.number_input("Horizon (steps)", min_value=1, max_value=5_000, value=252)
+    with Seed:
+        seed = st.number_input("Seed", min_value=0, value=42)
+
+    # keep the last result across reruns, e.g. when another widget of the dashboard changes
+    if st.button("Run simulation"):
+        with st.spinner("Simulating..."):
+            try:
+                result = run_simulation(data_file_path, version, currency, rates, basis, int(n_paths), int(horizon), int(seed))
+            except ValueError as error:
+                st.warning(f"Cannot simulate: {error}.")
+                return
+        st.session_state['simulation'] = {'version': version, 'currency': currency, 'basis': basis,
+                                          'n_paths': int(n_paths), 'horizon': int(horizon), 'result': result}
+
+    simulation = st.session_state.get('simulation')
+    if simulation is None or simulation['currency'] != currency:
+        return
+
+    result = simulation['result']
+    caption = f"{simulation['n_paths']} paths of {simulation['horizon']} steps, resampled from {result['returns']} realized {simulation['basis']} returns."
+    if simulation['version'] != version:
+        caption += " New deals arrived since, run the simulation again to include them."
+    st.caption(caption)
+
+    SummaryTable, PathsPlot = st.columns([1, 2])
+
+    with SummaryTable:
+        st.dataframe(result['summary'], hide_index=True)
+
+    with PathsPlot:
+        st.plotly_chart(plot_simulated_paths(result['sample_paths'], currency_symbol=CURRENCY_SYMBOLS.get(currency, currency)))
+
+@st.cache_resource(max_entries=2)
+def load_trade_statistics(data_file_path: str, version: str, currency: str = config.ACCOUNT_CURRENCY, rates: Optional[str] = None) -> pd.DataFrame:
+    """
+    Compute the trade statistics per symbol once per data version and rate table version.
+    """
+    return trade_statistics(load_deals(data_file_path, version, currency, rates))
+
+def trade_statistics_panel(data_file_path: str, version: str, currency: str = config.ACCOUNT_CURRENCY, rates: Optional[str] = None) -> None:
+    """
+    Render the trade-quality panel: overall win rate, profit factor, expectancy, average win/loss
+    and streaks, and the same statistics per symbol.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+        version (str): The data version of the deal file.
+        currency (str): The reporting currency.
+        rates (str, optional): The version of the rate table, see `rates_version`.
+    """
+    stats = load_trade_statistics(data_file_path, version, currency, rates)
+    if stats.empty:
+        st.info("There are no closed trades yet.")
+        return
+
+    cur = CURRENCY_SYMBOLS.get(currency, currency)
+    overall = stats.loc[ALL_SYMBOLS]
+
+    WinRate, ProfitFactor, Expectancy, AverageWin, AverageLoss, Streaks = st.columns(6)
+
+    with WinRate:
+        st.metric(label="Win Rate", value=f"{round(overall['win_rate_%'], 1)} %")
+    with ProfitFactor:
+        st.metric(label="Profit Factor", value=f"{round(overall['profit_factor'], 2)}")
+    with Expectancy:
+        st.metric(label="Expectancy", value=f"{round(overall['expectancy'], 2)} {cur}")
+    with AverageWin:
+        st.metric(label="Average Win", value=f"{round(overall['avg_win'], 2)} {cur}")
+    with AverageLoss:
+        st.metric(label="Average Loss", value=f"{round(overall['avg_loss'], 2)} {cur}")
+    with Streaks:
+        st.metric(label="Longest Streaks (W/L)", value=f"{int(overall['max_win_streak'])} / {int(overall['max_loss_streak'])}")
+
+    st.dataframe(stats.round(2), use_container_width=True)
+
+@st.cache_resource(max_entries=2)
+def load_execution_quality(data_file_path: str, version: str) -> Dict:
+    """
+    Compute the slippage and fill-latency distributions once per data version.
+    """
+    return execution_quality(load_deals(data_file_path, version))
+
+def execution_panel(data_file_path: str, version: str) -> None:
+    """
+    Render the execution-quality panel: slippage and fill-latency distributions per symbol
+    and per hour.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+        version (str): The data version of the deal file.
+    """
+    quality = load_execution_quality(data_file_path, version)
+    if quality['fills'] is None or quality['fills'].empty:
+        st.info("The deal file has no linked orders. Extract it with the current ETL to see slippage and fill latency.")
+        return
+
+    st.caption("Slippage in basis points of the requested price, positive is adverse. Latency from order placement to fill.")
+    st.dataframe(quality['by_symbol'].round(2), use_container_width=True)
+
+    SlippagePlot, LatencyPlot = st.columns(2)
+
+    with SlippagePlot:
+        st.plotly_chart(plot_quantiles_by_hour(quality['by_hour'], 'slippage_bps', title="Slippage by Hour", yaxis_title="Slippage (bps)"))
+    with LatencyPlot:
+        st.plotly_chart(plot_quantiles_by_hour(quality['by_hour'], 'latency_ms', title="Fill Latency by Hour", yaxis_title="Latency (ms)"))
+
+def deal_explorer(data_file_path: str, version: str, currency: str = config.ACCOUNT_CURRENCY, rates: Optional[str] = None) -> None:
+    """
+    Render the raw deal table with server-side filtering, sorting and paging.
+
+    Only the rows of the visible page are sent to the browser.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+        version (str): The data version of the deal file.
+        currency (str): The reporting currency.
+        rates (str, optional): The version of the rate table, see `rates_version`.
+    """
+    index = load_deal_index(data_file_path, version, currency, rates)
+    df = index['frame']
+
+    Symbols, Types, Dates, Position = st.columns(4)
+
+    with Symbols:
+        symbols = st.multiselect("Symbol", [s for s in index['symbols'] if s])
+    with Types:
+        types = st.multiselect("Type", list(DEAL_TYPES), format_func=lambda t: DEAL_TYPES[t])
+    with Dates:
+        first_day, last_day = index['day'].min().item(), index['day'].max().item()
+        date_range = st.date_input("Date range", value=(first_day, last_day),
+                                   min_value=first_day, max_value=last_day)
+        # the widget returns a single date while the range is being picked
+        if len(date_range) == 1:
+            date_range = (date_range[0], None)
+    with Position:
+        position_id = st.text_input("Position ID")
+        position_id = int(position_id) if position_id.strip().isdigit() else None
+
+    SortBy, Direction, PageSize, Page = st.columns(4)
+
+    with SortBy:
+        sort_by = st.selectbox("Sort by", [None] + [c for c in SORTABLE_COLUMNS if c in df.columns],
+                               format_func=lambda c: 'file order' if c is None else c)
+    with Direction:
+        ascending = st.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Ascending"
+    with PageSize:
+        page_size = st.selectbox("Rows per page", [50, 100, 500, 1000], index=1)
+
+    # Count the matches first so the page selector knows its bounds
+    _, total = query_deals(index, symbols, types, date_range, position_id, page_size=0)
+    pages = max(1, -(-total // page_size))
+
+    with Page:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+
+    page_df, total = query_deals(index, symbols, types, date_range, position_id,
+                                 sort_by=sort_by, ascending=ascending, page=page, page_size=page_size)
+
+    first_row = page * page_size + 1 if total else 0
+    st.caption(f"Showing deals {first_row}-{page * page_size + len(page_df)} of {total}")
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
+
+def main(data_file_path:str, out_of_core: bool = config.OUT_OF_CORE):
+    """
+    Run the dashboard.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL, or to a segmented deal
+                              store directory (see `segment_store`), which is always read in
+                              bounded-memory mode.
+        out_of_core (bool): Stream the deal file in chunks of config.CHUNK_SIZE rows and compute
+                            every panel from the merged aggregates, for histories larger than RAM.
+                            The raw deal explorer is unavailable in this mode.
+    """
+    # archived deals of a store only exist as rollups
+    out_of_core = out_of_core or os.path.isdir(data_file_path)
     
     #settingup loggin file!
     setup_logging(config.LOG_PATH)
@@ -579,10 +1053,23 @@ def main(data_file_path:str):
     # reading the csv file!
     
     
-    df = pd.read_csv(data_file_path)
+    version = current_version(data_file_path, out_of_core)
+
+    # reporting currency: every panel reuses the converted deals
+    currency = st.sidebar.selectbox("Reporting currency", config.REPORTING_CURRENCIES,
+                                    index=config.REPORTING_CURRENCIES.index(config.ACCOUNT_CURRENCY))
+    rates = rates_version()
+    if rates is None and currency != config.ACCOUNT_CURRENCY:
+        st.sidebar.warning(f"No rate table at {config.FX_RATES_PATH}, amounts are shown in {config.ACCOUNT_CURRENCY}.")
+        currency = config.ACCOUNT_CURRENCY
+    cur = CURRENCY_SYMBOLS.get(currency, currency)
+
+    df = load_frame(data_file_path, version, out_of_core, currency, rates)
+    if out_of_core:
+        trade_count = load_aggregated_deals(data_file_path, version, config.CHUNK_SIZE)[1]
 
     # creating tabs for displaying daily and total metrics!
-    tab1, tab2 = st.tabs(["Daily", "Total"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Daily", "Total", "Time of Day", "Simulation", "Deals", "Trade Stats", "Execution"])
 
     with tab1:
 
@@ -594,14 +1081,14 @@ def main(data_file_path:str):
             with Deposit:
                 df = df.copy()
                 deposit  =sum(df.loc[df.type == 2].profit.tolist())
-                st.metric(label="Deposit", value=f"{deposit} €")
+                st.metric(label="Deposit", value=f"{deposit:,.2f} {cur}")
 
             with Current_Portfolio_Value:
                 df_growth = get_portfolio_growth(df,profit = False)
                 df_profit = get_portfolio_growth(df)
                 current_portfolio_value = df_growth.sort_values(by = 'date', ascending = False)['growth'].to_list()[0]
                 profit_or_Loss = df_profit.sort_values(by = 'date', ascending = False)['growth'].to_list()[0]
-                st.metric(label="Portfolio Value:", value=f"{round(current_portfolio_value,1)} €", delta=f"{round(profit_or_Loss,2)} €")
+                st.metric(label="Portfolio Value:", value=f"{round(current_portfolio_value,1)} {cur}", delta=f"{round(profit_or_Loss,2)} {cur}")
 
             with Profit_Loss:
                 if profit_or_Loss < 0:
@@ -616,19 +1103,19 @@ def main(data_file_path:str):
                 df_commission = df_commission.sort_values(by='date', ascending = False).reset_index()
                 df_commission = df_commission.drop(columns = ['index'])
                 commissions = round(df_commission.commission.to_list()[0],2)
-                st.metric(label="Daily Commissions", value=f"{round(commissions,2)} €")
+                st.metric(label="Daily Commissions", value=f"{round(commissions,2)} {cur}")
 
             with DailySwaps:
                 df = df.copy()
                 df_swaps = df.groupby(by='date')['swap'].sum().reset_index()
                 df_swaps = df_swaps.sort_values(by=['date'], ascending = False)
                 swaps = df_swaps['swap'][0]
-                st.metric(label="Swaps", value=f"{round(swaps,2)} €")
+                st.metric(label="Swaps", value=f"{round(swaps,2)} {cur}")
 
             with DailyTradesTaken:
                 df = df.copy()
                 df_trade = df.loc[df['type'] == 0]
-                df_trade = df_trade.groupby(by = 'date').size().reset_index(name='count')
+                df_trade = count_deals(df_trade, ['date'])
                 trades_taken_yesturday = df_trade.sort_values(by='date', ascending = False)['count'].to_list()[0]
                 st.metric(label="# Trades", value=f"{trades_taken_yesturday}")
             
@@ -663,74 +1150,120 @@ def main(data_file_path:str):
             with Deposit:
                 df = df.copy()
                 deposit  =sum(df.loc[df.type == 2].profit.tolist())
-                st.metric(label="Deposit", value=f"{deposit} €")
+                st.metric(label="Deposit", value=f"{deposit:,.2f} {cur}")
 
             with total_profit_loss:
                 df_growth = get_portfolio_growth(df,profit = False)
                 current_portfolio_value = df_growth.sort_values(by = 'date', ascending = False)['growth'].to_list()[0]
                 total_profit_or_Loss = round(current_portfolio_value/(deposit)*100,1) -100
                 total_profit_or_Loss_eur = round((current_portfolio_value - deposit),2)
-                st.metric(label="Total Portfolio Growth:", value=f"{total_profit_or_Loss_eur} €", delta=f"{round(total_profit_or_Loss,1)} %")
+                st.metric(label="Total Portfolio Growth:", value=f"{total_profit_or_Loss_eur} {cur}", delta=f"{round(total_profit_or_Loss,1)} %")
 
             with Commission:
                 df = df.copy()
                 df_commission = df.groupby(by='date')['commission'].sum().reset_index()
                 total_commissions = df_commission.commission.sum()
-                st.metric(label="Total Commissions", value=f"{round(total_commissions,2)} €", delta = f"{abs(round(commissions,2))} €")
+                st.metric(label="Total Commissions", value=f"{round(total_commissions,2)} {cur}", delta = f"{abs(round(commissions,2))} {cur}")
 
             with Swaps:
                 df = df.copy()
                 df_swaps = df.groupby(by='date')['swap'].sum().reset_index()
                 total_swaps = df_swaps.swap.sum()
-                st.metric(label="Total Swaps", value=f"{round(total_swaps,2)} €", delta = f"{abs(round(swaps,2))} €")
+                st.metric(label="Total Swaps", value=f"{round(total_swaps,2)} {cur}", delta = f"{abs(round(swaps,2))} {cur}")
 
             with TotalTradesTaken:
-                trade = total_trades(df)
+                trade = trade_count if out_of_core else total_trades(df)
                 st.metric(label = 'total trades', value = f"{trade}" ,delta = f"{trades_taken_yesturday}")
 
+    with tab3:
+
+        time_of_day_analytics(data_file_path, version, out_of_core, currency, rates)
+
+    with tab4:
+
+        if out_of_core:
+            st.info("The simulation needs the raw deals and is disabled in bounded-memory mode.")
+        else:
+            monte_carlo_simulation(data_file_path, version, currency, rates)
+
+    with tab5:
+
+        if out_of_core:
+            st.info("The deal explorer needs the raw deals and is disabled in bounded-memory mode.")
+        else:
+            deal_explorer(data_file_path, version, currency, rates)
+
+    with tab6:
+
+        if out_of_core:
+            st.info("The trade statistics need the raw deals and are disabled in bounded-memory mode.")
+        else:
+            trade_statistics_panel(data_file_path, version, currency, rates)
+
+    with tab7:
+
+        if out_of_core:
+            st.info("The execution analytics need the raw deals and are disabled in bounded-memory mode.")
+        else:
+            execution_panel(data_file_path, version)
+
+    # per-symbol drilldown: every panel below is built from the precomputed view of the selected symbol
+    rollups = load_symbol_rollups(data_file_path, version, out_of_core, currency, rates)
+    symbol = st.sidebar.selectbox("Symbol", [ALL_SYMBOLS] + rollups['symbols'])
+
+    if symbol != ALL_SYMBOLS:
+        symbol_deals = df.take(rollups['rows'][symbol])
+        if out_of_core:
+            st.sidebar.caption(f"{symbol}: {symbol_deals['deals'].sum()} deals")
+        else:
+            st.sidebar.caption(f"{symbol}: {len(symbol_deals)} deals, {total_trades(symbol_deals)} trades")
+
     with st.container():
 
         GrowthPlot, ProfitPlot = st.columns(2)
     
         with GrowthPlot:
 
-            growthplot = plot_growth_over_time(get_portfolio_growth(df, profit = False), 'date', 'growth', title="Growth Over Time", yaxis_title= 'Daily_Portfolio (€)')
-            st.plotly_chart(growthplot)
+            growthplot = load_chart(data_file_path, version, out_of_core, currency, rates, symbol, 'growth')
+            st.plotly_chart(figure_from_spec(growthplot))
             
         with ProfitPlot:
-            profitplot = profit_over_time(get_portfolio_growth(df), 'date', 'growth', title="Daily Profit", yaxis_title= 'Daily Profit (€)')
-            st.plotly_chart(profitplot)
+            profitplot = load_chart(data_file_path, version, out_of_core, currency, rates, symbol, 'profit')
+            st.plotly_chart(figure_from_spec(profitplot))
 
         DailyCommodityDeals, TotalCommodityDeals = st.columns(2)
 
         with DailyCommodityDeals:
 
-            daily_commodity_deals = daily_commodities_trade_pie_chart(df, create_symbol_count_dataframe)
-            st.plotly_chart(daily_commodity_deals)
+            daily_commodity_deals = load_chart(data_file_path, version, out_of_core, currency, rates, ALL_SYMBOLS, 'daily_pie')
+            st.plotly_chart(figure_from_spec(daily_commodity_deals))
 
         with TotalCommodityDeals:
 
-            total_commodity_deals = plot_piechart(df)
-            st.plotly_chart(total_commodity_deals)
+            total_commodity_deals = load_chart(data_file_path, version, out_of_core, currency, rates, ALL_SYMBOLS, 'total_pie')
+            st.plotly_chart(figure_from_spec(total_commodity_deals))
 
 
         Trades, WeeklyGrowth, MonthlyGrowthProfit = st.columns(3, gap="medium")
 
         with Trades:
 
-            df_trade = df.loc[df['type'] == 0]
-            df_trade = df_trade.groupby(by = 'date').size().reset_index(name='count')
-            plot_total_daily_trades =  profit_over_time(df_trade, 'date', 'count', title="Daily Number of Trade!", yaxis_title= 'Daily Number of Trades Taken')
-            st.plotly_chart(plot_total_daily_trades)
+            plot_total_daily_trades = load_chart(data_file_path, version, out_of_core, currency, rates, symbol, 'trades')
+            st.plotly_chart(figure_from_spec(plot_total_daily_trades))
 
         with WeeklyGrowth:
 
-            weekly_growth = create_growth_chart(df, weeklygrowth = True)
-            st.plotly_chart(weekly_growth)
+            frequency = st.selectbox("Frequency", FREQUENCIES, index=FREQUENCIES.index('weekly'), key='growth_frequency_1')
+            weekly_growth = load_chart(data_file_path, version, out_of_core, currency, rates, symbol, 'period', frequency)
+            st.plotly_chart(figure_from_spec(weekly_growth), key='growth_period_1')
 
         with MonthlyGrowthProfit:
-            monthly_growth = create_growth_chart(df, weeklygrowth = False)
-            st.plotly_chart(monthly_growth)
+            frequency = st.selectbox("Frequency", FREQUENCIES, index=FREQUENCIES.index('monthly'), key='growth_frequency_2')
+            monthly_growth = load_chart(data_file_path, version, out_of_core, currency, rates, symbol, 'period', frequency)
+            st.plotly_chart(figure_from_spec(monthly_growth), key='growth_period_2')
+
+    if config.AUTO_REFRESH:
+        watch_deal_file(data_file_path, version, out_of_core)
 
 if __name__ == '__main__':
     data_file_path = 'fx_history.csv'
@@ -6,4 +6,44 @@ FILE_PATH = 'fx_history.csv'
 
 # Start_date
 from datetime import datetime
-DATETIME = datetime(2023, 9, 27) # year, month, day
\ No newline at end of file
+DATETIME = datetime(2023, 9, 27) # year, month, day
+
+# Trading sessions as (name, start hour) in deal-time hours, ordered by start hour
+TRADING_SESSIONS = [('Asia', 0), ('London', 7), ('London/New York', 12), ('New York', 16), ('Off-hours', 21)]
+
+# Bounded-memory mode: stream the deal file in chunks of CHUNK_SIZE rows instead of loading it whole
+OUT_OF_CORE = False
+CHUNK_SIZE = 250_000
+
+# Auto-refresh: seconds between checks of the deal file for appended deals
+AUTO_REFRESH = True
+REFRESH_INTERVAL = 5
+
+# Port of the JSON metrics endpoint (fx_analytics.metrics_api)
+METRICS_PORT = 8502
+
+# Monte Carlo simulation: number of paths, worker processes (None = all CPUs) and paths per batch
+MC_PATHS = 10_000
+MC_WORKERS = None
+MC_BATCH_SIZE = 2_000
+
+# Currencies: deposit currency of deals without a 'currency' column, currencies offered for reporting,
+# and the local daily rate table (rates are the value of one unit of a currency in RATE_BASE_CURRENCY)
+ACCOUNT_CURRENCY = 'EUR'
+REPORTING_CURRENCIES = ['EUR', 'USD', 'GBP', 'JPY', 'CHF']
+RATE_BASE_CURRENCY = 'EUR'
+FX_RATES_PATH = 'fx_rates.csv'
+
+# Segmented deal store (fx_analytics.segment_store): target rows per compacted segment, months of raw
+# deals kept live before they are archived into rollups (None keeps everything), seconds between
+# background maintenance runs, and seconds superseded files are kept for readers of an older manifest
+SEGMENT_ROWS = 100_000
+RETENTION_MONTHS = 24
+MAINTENANCE_INTERVAL = 600
+OBSOLETE_GRACE = MAINTENANCE_INTERVAL
+
+# Figure cache: serialized figure specs kept in memory (LRU), and the directory of specs shared between
+# dashboard processes and restarts (None disables the disk tier, e.g. '.figure_cache' enables it) with its maximum size
+FIGURE_CACHE_SIZE = 64
+FIGURE_CACHE_DIR = None
+FIGURE_CACHE_FILES = 256
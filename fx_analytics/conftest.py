@@ -0,0 +1,4 @@
+from fx_analytics import mt5_simulator
+
+# main_functions imports MetaTrader5: register the simulator before any test module imports it
+mt5_simulator.install()
@@ -0,0 +1,144 @@
+"""
+Conversion of deal amounts into a reporting currency.
+
+Rates are kept in a local daily rate table with the columns 'date', 'currency' and 'rate',
+where 'rate' is the value of one unit of 'currency' in config.RATE_BASE_CURRENCY. The table can
+be built from MT5 daily bars (`main_functions.extract_rates_mt5`) or from any file in that
+format. Amounts are converted with one as-of join of the deals against the table: every deal
+uses the latest rate on or before its date.
+"""
+import os
+from typing import Optional
+import numpy as np
+import pandas as pd
+from loguru import logger
+from fx_analytics import config
+
+# columns holding amounts in the account currency
+MONEY_COLUMNS = ['profit', 'commission', 'swap', 'fee']
+
+CURRENCY_SYMBOLS = {'EUR': '€', 'USD': '$', 'GBP': '£', 'JPY': '¥', 'CHF': 'CHF', 'AUD': 'A$', 'CAD': 'C$'}
+
+
+def load_rate_table(path: str = config.FX_RATES_PATH) -> Optional[pd.DataFrame]:
+    """
+    Read the cached daily rate table.
+
+    Args:
+        path (str): Path to the rate table. Default is config.FX_RATES_PATH.
+
+    Returns:
+        pd.DataFrame | None: The rates sorted by date, or None if the file does not exist.
+    """
+    if not os.path.isfile(path):
+        return None
+
+    rates = pd.read_csv(path, parse_dates=['date'])
+    return rates.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def save_rate_table(rates: pd.DataFrame, path: str = config.FX_RATES_PATH) -> None:
+    """
+    Merge rates into the cached rate table, newer rows replacing older ones for the same day.
+
+    Args:
+        rates (pd.DataFrame): Rates with 'date', 'currency' and 'rate' columns.
+        path (str): Path to the rate table. Default is config.FX_RATES_PATH.
+    """
+    cached = load_rate_table(path)
+    rates = rates.assign(date=pd.to_datetime(rates['date']))
+    if cached is not None:
+        rates = pd.concat([cached, rates])
+
+    rates = rates.drop_duplicates(subset=['date', 'currency'], keep='last').sort_values(['date', 'currency'])
+    rates[['date', 'currency', 'rate']].to_csv(path, index=False, date_format='%Y-%m-%d')
+    logger.info("Saved {} rates to {}", len(rates), path)
+
+
+def _asof_rates(dates: np.ndarray, currencies: np.ndarray, rates: pd.DataFrame) -> np.ndarray:
+    """
+    Look up the latest rate on or before each date for each currency with one as-of join.
+
+    Dates before the first rate of a currency use its first rate, with a warning naming the
+    currencies and the number of deals affected. The base currency has rate 1.
+    """
+    deals = pd.DataFrame({'date': dates.astype('datetime64[ns]'), 'currency': currencies, 'row': np.arange(len(dates))})
+    rates = rates.assign(date=rates['date'].astype('datetime64[ns]'))
+    merged = pd.merge_asof(deals.sort_values('date', kind='stable'), rates[['date', 'currency', 'rate']],
+                           on='date', by='currency', direction='backward')
+
+    looked_up = np.empty(len(dates))
+    looked_up[merged['row'].to_numpy()] = merged['rate'].to_numpy()
+
+    # Before the first rate: fall back to the earliest rate of the currency
+    missing = np.isnan(looked_up) & (currencies != config.RATE_BASE_CURRENCY)
+    if missing.any():
+        first_rates = rates.groupby('currency')['rate'].first()
+        looked_up[missing] = pd.Series(currencies[missing]).map(first_rates).to_numpy()
+
+        early = missing & ~np.isnan(looked_up)
+        if early.any():
+            logger.warning("{} deals in {} are dated before the first rate in the rate table and use its "
+                           "earliest rate; extend the rate table back to {}", int(early.sum()),
+                           sorted(set(currencies[early])), pd.Timestamp(dates[early].min()).date())
+
+    looked_up[currencies == config.RATE_BASE_CURRENCY] = 1.0
+
+    if np.isnan(looked_up).any():
+        unknown = sorted(set(currencies[np.isnan(looked_up)]))
+        raise ValueError(f"No rates for {unknown} in the rate table")
+
+    return looked_up
+
+
+def convert_to_reporting_currency(df: pd.DataFrame,
+                                  rates: pd.DataFrame,
+                                  reporting_currency: str,
+                                  account_currency: str = config.ACCOUNT_CURRENCY) -> pd.DataFrame:
+    """
+    Convert the amounts of deals into a reporting currency.
+
+    Deals of consolidated accounts carry their deposit currency in a 'currency' column; without
+    it, all deals are taken to be in `account_currency`. The conversion factor of every deal is
+    found with a single vectorized as-of join per side of the conversion.
+
+    Args:
+        df (pd.DataFrame): Raw or aggregated deals with a 'date' column and the MONEY_COLUMNS.
+        rates (pd.DataFrame): The rate table, see `load_rate_table`.
+        reporting_currency (str): Currency to report in, e.g. 'USD'.
+        account_currency (str): Currency of deals without a 'currency' column.
+
+    Returns:
+        pd.DataFrame: A copy of df with the MONEY_COLUMNS converted and the applied factor in 'fx_rate'.
+
+    Raises:
+        ValueError: If the rate table has no rates for a needed currency.
+
+    Example:
+        >>> usd = convert_to_reporting_currency(df, load_rate_table(), 'USD')
+    """
+    df = df.copy()
+
+    dates = pd.to_datetime(df['date']).to_numpy()
+    if 'currency' in df.columns:
+        currencies = df['currency'].fillna(account_currency).to_numpy(dtype=object)
+    else:
+        currencies = np.full(len(df), account_currency, dtype=object)
+
+    # value of the deal currency and of the reporting currency in the base currency
+    from_rates = _asof_rates(dates, currencies, rates)
+    to_rates = _asof_rates(dates, np.full(len(df), reporting_currency, dtype=object), rates)
+
+    df['fx_rate'] = from_rates / to_rates
+    df[MONEY_COLUMNS] = df[MONEY_COLUMNS].mul(df['fx_rate'], axis=0)
+
+    return df
+
+
+def needs_conversion(df: pd.DataFrame, reporting_currency: str, account_currency: str = config.ACCOUNT_CURRENCY) -> bool:
+    """
+    Tell whether any deal is not already in the reporting currency.
+    """
+    if 'currency' in df.columns:
+        return bool((df['currency'].fillna(account_currency) != reporting_currency).any())
+    return account_currency != reporting_currency
@@ -0,0 +1,59 @@
+import os
+from typing import Iterable, Iterator, Optional
+import pandas as pd
+from loguru import logger
+
+
+def data_version(data_file_path: str) -> str:
+    """
+    Return a version string for a deal source that changes whenever the source changes.
+
+    The version is built from the file size and modification time, so it can be computed on
+    every dashboard rerun without reading the data. Derived results (indices, rollups, figures)
+    are cached under this version.
+
+    Args:
+        data_file_path (str): Path to the deal file.
+
+    Returns:
+        str: The data version, e.g. '1697035030631000000-84213'.
+
+    Raises:
+        FileNotFoundError: If the deal source does not exist.
+    """
+    stat = os.stat(data_file_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def read_deals(data_file_path: str) -> pd.DataFrame:
+    """
+    Read the full deal file into a DataFrame.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+
+    Returns:
+        pd.DataFrame: The deals.
+    """
+    logger.info("Reading deals from {}", data_file_path)
+    return pd.read_csv(data_file_path)
+
+
+def iter_deal_chunks(data_file_path: str, chunksize: int, columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the deal file in chunks of at most `chunksize` rows.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+        chunksize (int): Maximum number of rows per chunk; bounds the memory used per chunk.
+        columns (Iterable[str], optional): Read only these columns (missing ones are skipped).
+
+    Yields:
+        pd.DataFrame: The next chunk of deals.
+    """
+    wanted = None if columns is None else set(columns)
+    usecols = None if wanted is None else (lambda column: column in wanted)
+
+    logger.info("Streaming deals from {} in chunks of {} rows", data_file_path, chunksize)
+    with pd.read_csv(data_file_path, chunksize=chunksize, usecols=usecols) as reader:
+        yield from reader
@@ -0,0 +1,135 @@
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# MT5 deal types shown in the explorer
+DEAL_TYPES = {0: 'Buy', 1: 'Sell', 2: 'Balance', 3: 'Credit', 4: 'Charge', 5: 'Correction', 6: 'Bonus'}
+
+# columns the explorer can sort by
+SORTABLE_COLUMNS = ['date', 'time', 'symbol', 'type', 'position_id', 'volume', 'price', 'profit',
+                    'commission', 'swap', 'fee']
+
+
+def build_deal_index(df: pd.DataFrame) -> Dict:
+    """
+    Build the filter/sort index used by the deal explorer.
+
+    The index holds the filterable columns as plain NumPy arrays (symbols as integer codes,
+    dates as day numbers) so filters are evaluated as vectorized masks without touching the
+    DataFrame. Sort orders are computed lazily, once per column, and reused for every query.
+    Build it once per data version.
+
+    Args:
+        df (pd.DataFrame): The deals, with at least 'date', 'type', 'symbol' and 'position_id' columns.
+
+    Returns:
+        Dict: The index, passed to `query_deals`.
+    """
+    # Encode symbols as integer codes; deposits have no symbol
+    symbol_codes, symbols = pd.factorize(df['symbol'].fillna(''), sort=True)
+
+    return {
+        'frame': df,
+        'symbols': symbols.to_numpy(),
+        'symbol_codes': symbol_codes,
+        'type': df['type'].to_numpy(),
+        'day': pd.to_datetime(df['date']).to_numpy().astype('datetime64[D]'),
+        'position_id': df['position_id'].to_numpy(),
+        'orders': {},
+    }
+
+
+def _sort_order(index: Dict, column: str, ascending: bool = True) -> np.ndarray:
+    """
+    Return the (cached) row order for a column and direction, with missing values last.
+
+    Values are ranked with `pd.factorize(sort=True)`, so every column sorts as integer codes
+    and the descending order is a stable sort of the negated codes (ties keep file order).
+    """
+    orders = index['orders']
+    if (column, ascending) not in orders:
+        if column == 'symbol':
+            # symbol codes are assigned in sorted order, so they sort like the symbols
+            codes = index['symbol_codes']
+        else:
+            codes, _ = pd.factorize(index['frame'][column], sort=True)
+
+        # missing values have code -1: rank them after every value in both directions
+        missing = codes < 0
+        key = codes.astype(np.int64) if ascending else -codes.astype(np.int64)
+        key[missing] = np.iinfo(np.int64).max
+        orders[(column, ascending)] = np.argsort(key, kind='stable')
+    return orders[(column, ascending)]
+
+
+def query_deals(index: Dict,
+                symbols: Optional[Iterable[str]] = None,
+                types: Optional[Iterable[int]] = None,
+                date_range: Optional[Tuple] = None,
+                position_id: Optional[int] = None,
+                sort_by: Optional[str] = None,
+                ascending: bool = True,
+                page: int = 0,
+                page_size: int = 100) -> Tuple[pd.DataFrame, int]:
+    """
+    Filter, sort and page the deals, materializing only the requested page.
+
+    Filters and sorting run on the index arrays; the DataFrame is only sliced for the
+    rows of the requested page.
+
+    Args:
+        index (Dict): The index built by `build_deal_index`.
+        symbols (Iterable[str], optional): Keep only these symbols.
+        types (Iterable[int], optional): Keep only these deal types.
+        date_range (Tuple, optional): Inclusive (start, end) dates; either end may be None.
+        position_id (int, optional): Keep only the deals of this position.
+        sort_by (str, optional): Column to sort by, one of SORTABLE_COLUMNS. Default keeps file order.
+        ascending (bool): Sort direction.
+        page (int): Zero-based page number.
+        page_size (int): Number of rows per page.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: The rows of the requested page and the total number of matching rows.
+
+    Raises:
+        ValueError: If sort_by is not a sortable column.
+
+    Example:
+        >>> index = build_deal_index(df)
+        >>> page_df, total = query_deals(index, symbols=['XAUUSD'], sort_by='profit', ascending=False)
+    """
+    if sort_by is not None and sort_by not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort_by}'")
+
+    # Build the filter mask on the index arrays
+    mask = np.ones(len(index['type']), dtype=bool)
+
+    if symbols:
+        wanted = np.flatnonzero(np.isin(index['symbols'], list(symbols)))
+        mask &= np.isin(index['symbol_codes'], wanted)
+
+    if types:
+        mask &= np.isin(index['type'], list(types))
+
+    if date_range:
+        start, end = date_range
+        if start is not None:
+            mask &= index['day'] >= np.datetime64(start, 'D')
+        if end is not None:
+            mask &= index['day'] <= np.datetime64(end, 'D')
+
+    if position_id is not None:
+        mask &= index['position_id'] == position_id
+
+    # Apply the filter in sorted order, without re-sorting
+    if sort_by is None:
+        rows = np.flatnonzero(mask)
+    else:
+        order = _sort_order(index, sort_by, ascending)
+        rows = order[mask[order]]
+
+    # Materialize only the requested page
+    total = len(rows)
+    page_rows = rows[page * page_size:(page + 1) * page_size]
+
+    return index['frame'].iloc[page_rows], total
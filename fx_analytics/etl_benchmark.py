@@ -0,0 +1,108 @@
+"""
+Throughput and memory harness for the ETL path, run against the MetaTrader5 simulator.
+
+Example (from the CLI):
+    python -m fx_analytics.etl_benchmark --sizes 1000 10000 100000 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Iterable
+
+import pandas as pd
+from loguru import logger
+
+from fx_analytics import mt5_simulator
+
+
+def benchmark_etl(sizes: Iterable[int] = (1_000, 10_000, 100_000),
+                  latency: float = 0.0,
+                  failure_rate: float = 0.0,
+                  repeats: int = 3,
+                  seed: int = 42,
+                  from_date: str = '2023-01-01') -> pd.DataFrame:
+    """
+    Measure ETL throughput (deals/sec) and peak memory for several deal stream sizes.
+
+    Args:
+        sizes (Iterable[int]): Number of deals served by the simulator for each run.
+        latency (float): Seconds the simulator sleeps on every API call.
+        failure_rate (float): Probability that a simulated API call fails.
+        repeats (int): Number of ETL runs per size.
+        seed (int): Seed for the simulator, so runs are reproducible.
+        from_date (str): Start date passed to the ETL, in the form of ('2023-09-24').
+
+    Returns:
+        pd.DataFrame: One row per size with the columns 'deals', 'runs', 'failures',
+                      'seconds' (median of successful runs), 'deals_per_sec' and 'peak_mb'
+                      (measured in one extra, untimed run without latency or failures).
+
+    All runs extract the same period, so the simulator generates the history once, in the
+    untimed run, and the configured latency is the only simulated cost of the timed runs.
+
+    Raises:
+        Exception: Any ETL error that was not caused by a simulated failure.
+    """
+    # the simulator has to be registered before main_functions imports MetaTrader5
+    mt5_simulator.install()
+    from fx_analytics.main_functions import ETL
+
+    credentials = {'login': 0, 'server': 'simulator', 'password': ''}
+    to_date = datetime.now()
+    results = []
+
+    # ETL logs every step, which would dominate the timings
+    logger.disable('fx_analytics')
+    try:
+        for size in sizes:
+            # Peak memory in a separate run: tracing slows the ETL down several-fold
+            mt5_simulator.configure(deals=size, latency=0.0, failure_rate=0.0, seed=seed)
+            tracemalloc.start()
+            try:
+                ETL(from_date, credentials, to_date)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            mt5_simulator.configure(latency=latency, failure_rate=failure_rate)
+            timings, failures = [], 0
+
+            for _ in range(repeats):
+                injected = mt5_simulator.injected_failures()
+                start = time.perf_counter()
+                try:
+                    ETL(from_date, credentials, to_date)
+                except Exception:
+                    # only failures injected by the simulator are expected, anything else is a bug
+                    if mt5_simulator.injected_failures() == injected:
+                        raise
+                    failures += 1
+                    continue
+                timings.append(time.perf_counter() - start)
+
+            seconds = pd.Series(timings, dtype=float).median()
+            results.append({
+                'deals': size,
+                'runs': repeats,
+                'failures': failures,
+                'seconds': round(seconds, 4),
+                'deals_per_sec': round(size / seconds, 1) if seconds > 0 else None,
+                'peak_mb': round(peak / 2**20, 2),
+            })
+    finally:
+        logger.enable('fx_analytics')
+        mt5_simulator.reset()
+
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the ETL path against the MT5 simulator")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(benchmark_etl(args.sizes, args.latency, args.failure_rate, args.repeats).to_string(index=False))
@@ -0,0 +1,164 @@
+"""
+Execution-quality analytics: slippage and fill latency of deals against their orders.
+
+Every deal is linked to the order it filled through a sorted key index of the orders: the
+order ticket (the deal's 'order') when the order is known, otherwise, for deals opening a
+position, the first order of the deal's 'position_id'. Both lookups are a single
+`np.searchsorted` over the sorted keys. The ETL stores the linked 'order_price' and
+'order_time_msc' with the deals, so the distributions are computed from the deal file alone.
+
+Slippage is signed so that positive values are adverse (filled above the requested price on
+buys, below it on sells) and is reported in price units and in basis points of the requested
+price, which compares across symbols.
+"""
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from fx_analytics.time_analytics import add_time_buckets
+
+# columns added to the deals by `link_deals_to_orders`
+ORDER_COLUMNS = ['order_price', 'order_time_msc']
+
+QUANTILES = [0.5, 0.9, 0.99]
+
+# deal entry that opens a position (DEAL_ENTRY_IN)
+ENTRY_IN = 0
+
+
+def build_order_index(orders: pd.DataFrame) -> Dict:
+    """
+    Sort the order keys once for the deal-to-order join.
+
+    Args:
+        orders (pd.DataFrame): Orders as returned by `history_orders_get`, with 'ticket',
+                               'position_id', 'time_setup_msc' and 'price_open' columns.
+
+    Returns:
+        Dict: 'tickets' and 'positions' (sorted keys) with the matching order row positions in
+              'ticket_rows' and 'position_rows', and the order 'frame'.
+    """
+    tickets = orders['ticket'].to_numpy(np.int64)
+    ticket_rows = np.argsort(tickets, kind='stable')
+
+    # the first order of every position: sort by position, then setup time
+    positions = orders['position_id'].to_numpy(np.int64)
+    position_rows = np.lexsort((orders['time_setup_msc'].to_numpy(np.int64), positions))
+    first = np.r_[True, positions[position_rows][1:] != positions[position_rows][:-1]]
+    position_rows = position_rows[first]
+
+    return {
+        'frame': orders,
+        'tickets': tickets[ticket_rows],
+        'ticket_rows': ticket_rows,
+        'positions': positions[position_rows],
+        'position_rows': position_rows,
+    }
+
+
+def _lookup(keys: np.ndarray, rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Return the order row of every value in the sorted keys, or -1 if it is missing.
+    """
+    if len(keys) == 0:
+        return np.full(len(values), -1)
+    at = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return np.where(keys[at] == values, rows[at], -1)
+
+
+def link_deals_to_orders(deals: Optional[pd.DataFrame], orders: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Add the requested price and setup time of the order behind every deal.
+
+    Args:
+        deals (pd.DataFrame | None): Deals with 'order', 'position_id' and 'entry' columns, or
+                                     None if the extraction found no deals.
+        orders (pd.DataFrame): Orders, see `build_order_index`.
+
+    Returns:
+        pd.DataFrame | None: A copy of deals with 'order_price' and 'order_time_msc' columns (NaN
+                             for deals without a known order, e.g. balance deals), or None.
+
+    Example:
+        >>> df = link_deals_to_orders(extract_data_mt5(from_date, mt5_credentials),
+        ...                           extract_orders_mt5(from_date, mt5_credentials))
+    """
+    if deals is None:
+        return None
+
+    deals = deals.copy()
+    index = build_order_index(orders)
+
+    rows = _lookup(index['tickets'], index['ticket_rows'], deals['order'].to_numpy(np.int64))
+
+    # Opening deals whose order is not in the history: fall back to the first order of their
+    # position, which is the order that opened it. Closing deals stay unlinked, as the opening
+    # order's price and time would report a fake slippage and latency for them.
+    opening = (deals['entry'] == ENTRY_IN).to_numpy() if 'entry' in deals.columns else np.zeros(len(deals), dtype=bool)
+    missing = (rows < 0) & opening & (deals['position_id'].to_numpy(np.int64) != 0)
+    rows[missing] = _lookup(index['positions'], index['position_rows'],
+                            deals['position_id'].to_numpy(np.int64)[missing])
+
+    found = rows >= 0
+    for column, source in zip(ORDER_COLUMNS, ['price_open', 'time_setup_msc']):
+        values = np.full(len(deals), np.nan)
+        values[found] = index['frame'][source].to_numpy(float)[rows[found]]
+        deals[column] = values
+
+    return deals
+
+
+def execution_quality(df: pd.DataFrame) -> Dict:
+    """
+    Compute the slippage and fill-latency distributions per symbol and per hour.
+
+    Args:
+        df (pd.DataFrame): Deals with the ORDER_COLUMNS, 'type', 'symbol', 'price' and
+                           'time_msc' columns.
+
+    Returns:
+        Dict: 'fills' (one row per linked trade deal with 'symbol', 'hour', 'slippage',
+              'slippage_bps' and 'latency_ms'), and 'by_symbol' and 'by_hour' tables with the
+              number of fills, the mean and the QUANTILES of slippage (bps) and latency (ms).
+              All None if the deals were extracted without their orders.
+    """
+    if 'order_price' not in df.columns:
+        return {'fills': None, 'by_symbol': None, 'by_hour': None}
+
+    # Trade deals with a priced order (pending orders filled at market have no requested price)
+    deals = df.loc[df['type'].isin([0, 1]) & (df['order_price'] > 0)]
+    if 'hour' not in deals.columns:
+        deals = deals.assign(time=pd.to_datetime(deals['time_msc'], unit='ms'))
+        deals = add_time_buckets(deals)
+
+    direction = np.where(deals['type'].to_numpy() == 0, 1.0, -1.0)
+    slippage = direction * (deals['price'].to_numpy() - deals['order_price'].to_numpy())
+
+    fills = pd.DataFrame({
+        'symbol': deals['symbol'].to_numpy(),
+        'hour': deals['hour'].to_numpy(),
+        'slippage': slippage,
+        'slippage_bps': slippage / deals['order_price'].to_numpy() * 10_000,
+        'latency_ms': deals['time_msc'].to_numpy() - deals['order_time_msc'].to_numpy(),
+    })
+
+    return {
+        'fills': fills,
+        'by_symbol': _distribution(fills, 'symbol'),
+        'by_hour': _distribution(fills, 'hour'),
+    }
+
+
+def _distribution(fills: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Summarize slippage and latency per key: fills, mean and quantiles, in one grouped pass each.
+    """
+    grouped = fills.groupby(key)[['slippage_bps', 'latency_ms']]
+
+    quantiles = grouped.quantile(QUANTILES).unstack()
+    quantiles.columns = [f"{column}_p{round(q * 100)}" for column, q in quantiles.columns]
+    means = grouped.mean().add_suffix('_mean')
+
+    table = pd.concat([grouped.size().rename('fills'), means, quantiles], axis=1)
+    order = [f"{column}_{stat}" for column in ['slippage_bps', 'latency_ms']
+             for stat in ['mean'] + [f"p{round(q * 100)}" for q in QUANTILES]]
+    return table[['fills'] + order]
@@ -0,0 +1,112 @@
+"""
+Serialized-spec tiers of the dashboard figure cache.
+
+Figures are cached as their serialized Plotly spec (a plain JSON dict) rather than as Figure
+objects. The key is a hash of the data version and the view parameters (symbol, chart, frequency,
+currency, rate table version, ...). The in-memory LRU tier is the dashboard's `st.cache_data`,
+which hands every session its own copy of the spec. The disk tier (one JSON file per key) lets
+specs survive server restarts and be shared between dashboard processes reading the same data.
+The least recently used files are evicted beyond `max_files`.
+
+A spec was validated when its figure was built, so `figure_from_spec` wraps it for rendering
+without validating it again; rebuilding a validated Figure on every rerun costs more than the
+chart itself.
+"""
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Optional
+from plotly.graph_objs import Figure
+from loguru import logger
+from fx_analytics import config
+
+
+def figure_key(**params) -> str:
+    """
+    Return the cache key of a figure: a hash of the data version and view parameters.
+
+    Example:
+        >>> figure_key(version='1697035030631000000-84213', symbol='EURUSD', chart='growth')
+    """
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def figure_spec(figure: Figure) -> Dict:
+    """
+    Serialize a figure into its JSON spec.
+    """
+    return json.loads(figure.to_json())
+
+
+def figure_from_spec(spec: Dict) -> Figure:
+    """
+    Wrap a spec produced by `figure_spec` into a Figure for `st.plotly_chart`, without validation.
+    """
+    return Figure(spec, _validate=False)
+
+
+def read_spec(key: str, directory: str) -> Optional[Dict]:
+    """
+    Read a cached figure spec, or return None if it is not cached.
+    """
+    path = os.path.join(directory, f"{key}.json")
+    try:
+        with open(path) as handle:
+            spec = json.load(handle)
+    except FileNotFoundError:
+        return None
+
+    # the modification time orders the files for eviction
+    os.utime(path)
+    return spec
+
+
+def write_spec(spec: Dict, key: str, directory: str, max_files: int = config.FIGURE_CACHE_FILES) -> None:
+    """
+    Write a figure spec and evict the least recently used files beyond `max_files`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{key}.json")
+    with open(f"{path}.{os.getpid()}.tmp", 'w') as handle:
+        json.dump(spec, handle)
+    os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    files = [entry for entry in os.scandir(directory) if entry.name.endswith('.json')]
+    if len(files) > max_files:
+        files.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in files[:len(files) - max_files]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        logger.info("Evicted {} figures from {}", len(files) - max_files, directory)
+
+
+def cached_spec(build: Callable[[], Figure], directory: Optional[str] = config.FIGURE_CACHE_DIR,
+                max_files: int = config.FIGURE_CACHE_FILES, **params) -> Dict:
+    """
+    Return the spec of a figure from the on-disk cache, building and storing it on a miss.
+
+    Args:
+        build (Callable[[], Figure]): Builds the figure on a cache miss.
+        directory (str, optional): Cache directory; None disables the disk tier.
+                                   Default is config.FIGURE_CACHE_DIR.
+        max_files (int): Maximum number of cached figures. Default is config.FIGURE_CACHE_FILES.
+        **params: The data version and view parameters identifying the figure.
+
+    Returns:
+        Dict: The figure spec, see `figure_from_spec`.
+
+    Example:
+        >>> spec = cached_spec(lambda: plot_piechart(df), 'figures', version=version, chart='total_pie')
+        >>> st.plotly_chart(figure_from_spec(spec))
+    """
+    if directory is None:
+        return figure_spec(build())
+
+    key = figure_key(**params)
+    spec = read_spec(key, directory)
+    if spec is None:
+        spec = figure_spec(build())
+        write_spec(spec, key, directory, max_files)
+    return spec
@@ -1,12 +1,15 @@
 import os
 import MetaTrader5 as mt5
+from contextlib import contextmanager
 from datetime import datetime, date
-from typing import List, Dict
+from typing import Iterator, List, Dict
 import pandas as pd
 from loguru import logger
 import plotly.express as px
 import plotly.graph_objects as go
 from fx_analytics import config
+from fx_analytics.execution import link_deals_to_orders
+from fx_analytics.time_analytics import add_time_buckets
 
 
 def setup_logging(log_file):
@@ -22,7 +25,101 @@ def setup_logging(log_file):
     logger.remove()  # Remove any previously added log handlers
     logger.add(log_file, rotation="1 day", level="INFO")
 
-def extract_data_mt5(from_date: str, mt5_credentials: dict) -> pd.DataFrame:
+@contextmanager
+def mt5_session(mt5_credentials: dict) -> Iterator[None]:
+    """
+    Connects and logs in to the MetaTrader 5 (MT5) terminal for the duration of a `with` block,
+    and shuts the connection down when the block exits.
+
+    Args:
+    mt5_credentials (dict): A dictionary with keys 'login', 'server', and 'password'.
+
+    Raises:
+    RuntimeError: If MT5 initialization or login fails.
+
+    Example:
+    >>> with mt5_session(mt5_credentials):
+    ...     deals = history_deals(datetime(2023, 9, 24), datetime.now())
+    """
+
+    # Initialize MT5 connection
+    if not mt5.initialize():
+        logger.error("initialize() failed, error code: %s", mt5.last_error())
+        raise RuntimeError("MT5 initialization failed")
+
+    try:
+        # Log in to the MT5 terminal
+        if not mt5.login(login=mt5_credentials['login'], server=mt5_credentials['server'], password=mt5_credentials['password']):
+            logger.error("Login failed, error code: %s", mt5.last_error())
+            raise RuntimeError("MT5 login failed")
+
+        yield
+
+    finally:
+        # Terminate the MT5 connection
+        mt5.shutdown()
+
+
+def history_deals(from_date: datetime, to_date: datetime) -> pd.DataFrame:
+    """
+    Retrieves the historical deals of a period from an open MT5 session (see `mt5_session`).
+
+    Args:
+    from_date (datetime): Start of the extraction period.
+    to_date (datetime): End of the extraction period.
+
+    Returns:
+    pd.DataFrame: A DataFrame with one row per deal, or None if no deals were found.
+    """
+
+    # Set display options for data retrieval
+    pd.set_option('display.max_columns', 500)  # Number of columns to be displayed
+    pd.set_option('display.width', 1500)       # Max table width to display
+
+    # Log MetaTrader5 package information
+    logger.info("MetaTrader5 package author: %s", mt5.__author__)
+    logger.info("MetaTrader5 package version: %s", mt5.__version__)
+
+    # Retrieve historical deals within the specified time period
+    deals = mt5.history_deals_get(from_date, to_date)
+
+    if deals is None:
+        error_code = mt5.last_error()
+        logger.warning("No deals found, error code = %d", error_code)
+        return None
+
+    elif len(deals) > 0:
+        logger.info("history_deals_get(%s, %s) = %d deals", from_date, to_date, len(deals))
+        # Create a DataFrame from the retrieved deals
+        df = pd.DataFrame(list(deals), columns=deals[0]._asdict().keys())
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+
+
+def history_orders(from_date: datetime, to_date: datetime) -> pd.DataFrame:
+    """
+    Retrieves the historical orders of a period from an open MT5 session (see `mt5_session`).
+
+    Args:
+    from_date (datetime): Start of the extraction period.
+    to_date (datetime): End of the extraction period.
+
+    Returns:
+    pd.DataFrame: A DataFrame with one row per order, or None if no orders were found.
+    """
+
+    # Retrieve historical orders within the specified time period
+    orders = mt5.history_orders_get(from_date, to_date)
+
+    if orders is None or len(orders) == 0:
+        logger.warning("No orders found, error code = {}", mt5.last_error())
+        return None
+
+    logger.info("history_orders_get({}, {}) = {} orders", from_date, to_date, len(orders))
+    return pd.DataFrame(list(orders), columns=orders[0]._asdict().keys())
+
+
+def extract_data_mt5(from_date: str, mt5_credentials: dict, to_date: datetime = None) -> pd.DataFrame:
     """
     Extracts historical trade data from the MetaTrader 5 (MT5) platform using its API.
 
@@ -34,6 +131,7 @@ def extract_data_mt5(from_date: str, mt5_credentials: dict) -> pd.DataFrame:
     from_date (str): A date string in the form of ('2023-09-24').
     mt5_credentials (dict): A dictionary with keys 'login', 'server', and 'password', providing 
                             the credentials for the MT5 account.
+    to_date (datetime, optional): End of the extraction period. Default is now.
 
     Returns:
     pd.DataFrame: A DataFrame containing historical trade data, or None if the extraction fails.
@@ -53,52 +151,95 @@ def extract_data_mt5(from_date: str, mt5_credentials: dict) -> pd.DataFrame:
     before using the function.
     """
 
-    # Initialize MT5 connection
-    if not mt5.initialize():
-        logger.error("initialize() failed, error code: %s", mt5.last_error())
-        raise RuntimeError("MT5 initialization failed")  
-    
-    try:
-        # Log in to the MT5 terminal
-        if not mt5.login(login=mt5_credentials['login'], server=mt5_credentials['server'], password=mt5_credentials['password']):
-            logger.error("Login failed, error code: %s", mt5.last_error())
-            raise RuntimeError("MT5 login failed")
+    with mt5_session(mt5_credentials):
+        # Define the time period for data extraction
+        return history_deals(datetime.strptime(from_date, '%Y-%m-%d'), to_date or datetime.now())
 
-        # Set display options for data retrieval
-        pd.set_option('display.max_columns', 500)  # Number of columns to be displayed
-        pd.set_option('display.width', 1500)       # Max table width to display
 
-        # Log MetaTrader5 package information
-        logger.info("MetaTrader5 package author: %s", mt5.__author__)
-        logger.info("MetaTrader5 package version: %s", mt5.__version__)
+def extract_orders_mt5(from_date: str, mt5_credentials: dict, to_date: datetime = None) -> pd.DataFrame:
+    """
+    Extracts the historical orders from the MetaTrader 5 (MT5) platform, for linking deals to
+    the orders they filled (see `execution.link_deals_to_orders`).
 
-        # Define the time period for data extraction
+    Args:
+    from_date (str): A date string in the form of ('2023-09-24').
+    mt5_credentials (dict): A dictionary with keys 'login', 'server', and 'password'.
+    to_date (datetime, optional): End of the extraction period. Default is now.
+
+    Returns:
+    pd.DataFrame: A DataFrame with one row per order, or None if no orders were found.
+
+    Raises:
+    RuntimeError: If MT5 initialization or login fails.
+
+    Example:
+    >>> orders = extract_orders_mt5('2023-09-24', mt5_credentials)
+    """
+
+    with mt5_session(mt5_credentials):
+        return history_orders(datetime.strptime(from_date, '%Y-%m-%d'), to_date or datetime.now())
+
+
+def extract_rates_mt5(currencies: List[str], from_date: str, mt5_credentials: dict,
+                      base_currency: str = config.RATE_BASE_CURRENCY) -> pd.DataFrame:
+    """
+    Extracts daily exchange rates from the MetaTrader 5 (MT5) platform for the currency rate table.
+
+    For every currency the daily close of '<currency><base>' is used, or the inverse of
+    '<base><currency>' if the broker only quotes that pair.
+
+    Args:
+    currencies (List[str]): Currencies to extract, e.g. ['USD', 'GBP'].
+    from_date (str): A date string in the form of ('2023-09-24').
+    mt5_credentials (dict): A dictionary with keys 'login', 'server', and 'password'.
+    base_currency (str): Currency the rates are expressed in. Default is config.RATE_BASE_CURRENCY.
+
+    Returns:
+    pd.DataFrame: Rates with the columns 'date', 'currency' and 'rate' (value of one unit of
+                  'currency' in base_currency), to be saved with `currency.save_rate_table`.
+
+    Raises:
+    RuntimeError: If MT5 initialization or login fails.
+
+    Example:
+    >>> rates = extract_rates_mt5(['USD', 'GBP'], '2023-09-24', mt5_credentials)
+    >>> save_rate_table(rates)
+    """
+
+    with mt5_session(mt5_credentials):
         from_date = datetime.strptime(from_date, '%Y-%m-%d')
         to_date = datetime.now()
+        tables = []
 
-        # Retrieve historical deals within the specified time period
-        deals = mt5.history_deals_get(from_date, to_date)
-
-        if deals is None:
-            error_code = mt5.last_error()
-            logger.warning("No deals found, error code = %d", error_code)
-            return None
-            
-        elif len(deals) > 0:
-            logger.info("history_deals_get(%s, %s) = %d deals", from_date, to_date, len(deals))
-            # Create a DataFrame from the retrieved deals
-            df = pd.DataFrame(list(deals), columns=deals[0]._asdict().keys())
-            df['time'] = pd.to_datetime(df['time'], unit='s')
-            return df  
-    
-    finally:
-        # Terminate the MT5 connection
-        mt5.shutdown()
+        for currency in currencies:
+            if currency == base_currency:
+                continue
+
+            # Direct quote first, inverse quote as fallback
+            bars = mt5.copy_rates_range(f"{currency}{base_currency}", mt5.TIMEFRAME_D1, from_date, to_date)
+            invert = bars is None or len(bars) == 0
+            if invert:
+                bars = mt5.copy_rates_range(f"{base_currency}{currency}", mt5.TIMEFRAME_D1, from_date, to_date)
+
+            if bars is None or len(bars) == 0:
+                logger.warning("No rates found for {}, error code = {}", currency, mt5.last_error())
+                continue
+
+            bars = pd.DataFrame(bars)
+            tables.append(pd.DataFrame({
+                'date': pd.to_datetime(bars['time'], unit='s').dt.normalize(),
+                'currency': currency,
+                'rate': 1.0 / bars['close'] if invert else bars['close'],
+            }))
+
+        logger.info("Extracted rates for {} currencies", len(tables))
+        return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=['date', 'currency', 'rate'])
 
 
 def data_transformation(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Transforms a DataFrame by splitting its 'time' column into separate 'date' and 'time' columns.
+    Transforms a DataFrame by splitting its 'time' column into separate 'date' and 'time' columns
+    and adding integer 'hour', 'weekday' and 'session' bucket columns.
 
     This function assumes the 'time' column in the input DataFrame contains datetime information 
     in the format 'YYYY-MM-DD HH:MM:SS'. The function splits this column into two new columns: 
@@ -106,7 +247,8 @@ def data_transformation(df: pd.DataFrame) -> pd.DataFrame:
     is converted to string type before the split for ease of processing.
 
     The new 'date' column is inserted into the original DataFrame, which is then returned with 
-    the additional column.
+    the additional column. The bucket columns (see `time_analytics.add_time_buckets`) keep the
+    intraday information for the time-of-day analytics.
 
     Args:
         df (pd.DataFrame): The original DataFrame containing at least a 'time' column with datetime information.
@@ -130,6 +272,9 @@ def data_transformation(df: pd.DataFrame) -> pd.DataFrame:
 
     logger.info("Data transformation in process ....")
 
+    # Add the hour/weekday/session buckets while 'time' still holds datetimes
+    df = add_time_buckets(df)
+
     # Convert 'time' column to string type to facilitate splitting
     df['time'] = df['time'].astype(str)
 
@@ -146,17 +291,22 @@ def data_transformation(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def ETL(from_date: str, mt5_credentials: dict) -> pd.DataFrame:
+def ETL(from_date: str, mt5_credentials: dict, to_date: datetime = None) -> pd.DataFrame:
     """
     Performs an Extract, Transform, Load (ETL) process on trading data from the MT5 platform.
 
     This function extracts trading data using the MetaTrader5 API, transforms the data,
     logs the process, saves the transformed data as a CSV file, and returns the data as a DataFrame.
-    The data extraction is performed based on the provided MT5 credentials.
+    The data extraction is performed based on the provided MT5 credentials. The order history of
+    the same period is extracted as well, and every deal gets the requested price and setup time
+    of its order ('order_price', 'order_time_msc') for the execution-quality analytics; if the
+    orders cannot be extracted, the deals are returned without these columns. Deals and orders
+    are retrieved in a single MT5 session.
 
     Args:
     from_date (str): A date string in the form of ('2023-09-24').
     mt5_credentials (dict): A dictionary containing 'login', 'server', and 'password' for the MT5 account.
+    to_date (datetime, optional): End of the extraction period. Default is now.
 
     Returns:
     pd.DataFrame: A DataFrame containing the transformed trading data, sorted by date in descending order.
@@ -168,8 +318,17 @@ def ETL(from_date: str, mt5_credentials: dict) -> pd.DataFrame:
     >>> print(trading_data_df)
     """
 
-    # Extract trading data from MT5
-    df = extract_data_mt5(from_date, mt5_credentials)
+    # Extract trading data and the orders behind it from MT5, over the same period and session
+    from_date = datetime.strptime(from_date, '%Y-%m-%d')
+    to_date = to_date or datetime.now()
+    with mt5_session(mt5_credentials):
+        df = history_deals(from_date, to_date)
+        # The orders only feed the execution analytics: without them the deals are still loaded
+        orders = history_orders(from_date, to_date)
+
+    # Link every deal to its order while the keys are still integers
+    if orders is not None:
+        df = link_deals_to_orders(df, orders)
 
     # Transform the extracted data
     df = data_transformation(df)
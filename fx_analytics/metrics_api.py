@@ -0,0 +1,246 @@
+"""
+Lightweight HTTP endpoint serving the dashboard metrics as JSON, for external pollers
+(Grafana, alerting).
+
+Metrics are computed once per data version and kept as serialized JSON. Every response carries
+an ETag derived from the data version, so a poller sending `If-None-Match` gets an empty
+304 response while the deals are unchanged. The deal file is checked for appended deals at most
+once per `refresh_interval`, by one request at a time; every other request serves the metrics
+already published, without locking or file I/O.
+
+Example (from the CLI):
+    python -m fx_analytics.metrics_api fx_history.csv --port 8502
+    curl -i http://127.0.0.1:8502/metrics
+"""
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+import pandas as pd
+from loguru import logger
+from fx_analytics import config
+from fx_analytics.out_of_core import count_trades
+from fx_analytics.periods import period_growth
+from fx_analytics.watcher import deal_snapshot, open_deal_tail, refresh_deal_tail
+
+
+def dashboard_metrics(df: pd.DataFrame) -> Dict:
+    """
+    Compute the headline numbers shown on the dashboard.
+
+    Args:
+        df (pd.DataFrame): The deals, with 'date', 'type', 'position_id', 'profit', 'swap',
+                           'commission' and 'fee' columns.
+
+    Returns:
+        Dict: Deposit, portfolio value, latest daily P&L, commissions, swaps, trade counts and
+              the current and previous weekly/monthly percentage growth.
+    """
+    periods = period_growth(df, ['daily', 'weekly', 'monthly'])
+    daily = periods['daily']
+    latest_date = df['date'].max()
+    latest = df.loc[df['date'] == latest_date]
+
+    # Current and previous period growth, newest first
+    growth = lambda frequency: [round(float(value), 2) for value in periods[frequency]['growth_%'].iloc[::-1].iloc[:2]]
+
+    return {
+        'date': str(latest_date),
+        'deposit': round(float(df.loc[df['type'] == 2, 'profit'].sum()), 2),
+        'portfolio_value': round(float(daily['balance'].iloc[-1]), 2) if len(daily) else None,
+        'daily_pnl': round(float(daily['total_profit'].iloc[-1]), 2) if len(daily) else None,
+        'daily_commission': round(float(latest['commission'].sum()), 2),
+        'daily_swap': round(float(latest['swap'].sum()), 2),
+        'total_commission': round(float(df['commission'].sum()), 2),
+        'total_swap': round(float(df['swap'].sum()), 2),
+        'daily_trades': int((latest['type'] == 0).sum()),
+        'total_trades': count_trades(df),
+        'weekly_growth_pct': growth('weekly'),
+        'monthly_growth_pct': growth('monthly'),
+    }
+
+
+def _finite(value: Any) -> Any:
+    """
+    Replace non-finite numbers (e.g. the growth of a period opened at a zero balance) with None,
+    as JSON has no Infinity or NaN.
+    """
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def serialize_metrics(metrics: Dict) -> bytes:
+    """
+    Serialize the metrics as strict JSON, non-finite numbers as null.
+    """
+    return json.dumps({key: _finite(value) for key, value in metrics.items()}, allow_nan=False).encode()
+
+
+def open_metrics_state(data_file_path: str, refresh_interval: float = config.REFRESH_INTERVAL) -> Dict:
+    """
+    Create the cached state served by the metrics endpoint.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+        refresh_interval (float): Minimum seconds between checks of the deal file.
+                                  Default is config.REFRESH_INTERVAL.
+
+    Returns:
+        Dict: The state, with the watcher state of the deal file and the serialized metrics.
+    """
+    state = {'tail': open_deal_tail(data_file_path), 'metrics': (None, None, None), 'lock': threading.Lock(),
+             'refresh_interval': refresh_interval, 'refreshed': None}
+    current_metrics(state)
+    return state
+
+
+def _refresh_metrics(state: Dict) -> None:
+    """
+    Merge appended deals and recompute the metrics if the data version changed.
+    """
+    tail = state['tail']
+    refresh_deal_tail(tail)
+
+    version, frame = deal_snapshot(tail)
+    if state['metrics'][2] != version:
+        metrics = dashboard_metrics(frame)
+        metrics['data_version'] = version
+        etag = '"' + hashlib.sha1(version.encode()).hexdigest() + '"'
+        state['metrics'] = (serialize_metrics(metrics), etag, version)
+        logger.info("Metrics recomputed for data version {}", version)
+
+
+def current_metrics(state: Dict) -> Dict:
+    """
+    Return the serialized metrics and ETag of the current data version.
+
+    Once the refresh interval has elapsed, the first request to take the lock merges appended
+    deals and recomputes the metrics if the data version changed. Concurrent requests do not wait
+    for it and serve the metrics already published. The body, ETag and version are published as
+    one tuple, so a reader never mixes two versions.
+
+    Args:
+        state (Dict): The state created by `open_metrics_state`.
+
+    Returns:
+        Dict: 'body' (JSON bytes), 'etag' and 'version'.
+    """
+    refreshed = state['refreshed']
+    due = refreshed is None or time.monotonic() - refreshed >= state['refresh_interval']
+    if due and state['lock'].acquire(blocking=False):
+        try:
+            _refresh_metrics(state)
+            state['refreshed'] = time.monotonic()
+        finally:
+            state['lock'].release()
+
+    body, etag, version = state['metrics']
+    return {'body': body, 'etag': etag, 'version': version}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Return True if an If-None-Match header value matches the ETag: '*' or one of its
+    comma-separated (possibly weak) entity tags.
+    """
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Serve GET/HEAD /metrics from the cached state, with ETag revalidation.
+    """
+    state: Dict = None
+
+    def _respond(self, send_body: bool) -> None:
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        metrics = current_metrics(self.state)
+
+        # Unchanged data: no body, nothing recomputed or serialized
+        if etag_matches(self.headers.get('If-None-Match', ''), metrics['etag']):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', metrics['etag'])
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(metrics['body'])))
+        self.send_header('ETag', metrics['etag'])
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(metrics['body'])
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, format, *args):
+        # pollers hit the endpoint constantly, keep it out of the log file
+        pass
+
+
+def make_metrics_server(data_file_path: str, host: str = '127.0.0.1', port: int = config.METRICS_PORT,
+                        refresh_interval: float = config.REFRESH_INTERVAL) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a threaded HTTP server for the metrics endpoint.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+        host (str): Interface to bind. Default is localhost only.
+        port (int): Port to bind. Default is config.METRICS_PORT; 0 picks a free port.
+        refresh_interval (float): Minimum seconds between checks of the deal file.
+                                  Default is config.REFRESH_INTERVAL.
+
+    Returns:
+        ThreadingHTTPServer: The server; call `serve_forever()` to start it.
+    """
+    handler = type('BoundMetricsHandler', (MetricsHandler,), {'state': open_metrics_state(data_file_path, refresh_interval)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_metrics(data_file_path: str, host: str = '127.0.0.1', port: int = config.METRICS_PORT) -> None:
+    """
+    Serve the dashboard metrics at http://host:port/metrics until interrupted.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+        host (str): Interface to bind. Default is localhost only.
+        port (int): Port to bind. Default is config.METRICS_PORT.
+    """
+    server = make_metrics_server(data_file_path, host, port)
+    logger.info("Serving metrics on http://{}:{}/metrics", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the dashboard metrics as JSON")
+    parser.add_argument('data_file_path', nargs='?', default=config.FILE_PATH)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=config.METRICS_PORT)
+    args = parser.parse_args()
+
+    serve_metrics(args.data_file_path, args.host, args.port)
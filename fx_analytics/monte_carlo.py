@@ -0,0 +1,190 @@
+"""
+Monte Carlo simulation of equity curves by bootstrapping realized returns.
+
+Daily or per-trade returns are resampled with replacement into thousands of equity paths.
+Paths are simulated in batches as 2-D NumPy arrays (paths x steps) and the batches are
+sharded across a process pool, which is started once and reused by later runs. Every batch
+gets its own child of one `SeedSequence`, so results are reproducible for a given seed
+regardless of the number of workers.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from fx_analytics import config
+from fx_analytics.periods import daily_pnl
+
+# worker pool shared by all simulations, started on first use
+_pool = {'executor': None, 'workers': 0}
+_pool_lock = threading.Lock()
+
+
+def _returns(pnl: np.ndarray, opening_balance: np.ndarray) -> np.ndarray:
+    """
+    Divide P&L by the opening balance, skipping steps without a positive balance to relate
+    them to (e.g. trading before the first deposit).
+    """
+    valid = opening_balance > 0
+    return pnl[valid] / opening_balance[valid]
+
+
+def daily_returns(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return the daily returns of the realized equity curve (daily P&L over the opening balance).
+
+    Args:
+        df (pd.DataFrame): The deals, with 'date', 'type', 'profit', 'swap', 'commission' and 'fee' columns.
+
+    Returns:
+        np.ndarray: One return per trading day opened at a positive balance, in chronological order.
+    """
+    deposit, _, pnl = daily_pnl(df)
+    opening_balance = deposit + np.cumsum(pnl) - pnl
+    return _returns(pnl, opening_balance)
+
+
+def trade_returns(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return the per-trade returns (net P&L of every position over the balance before it closed).
+
+    Args:
+        df (pd.DataFrame): The deals, with 'date', 'type', 'position_id', 'profit', 'swap',
+                           'commission' and 'fee' columns.
+
+    Returns:
+        np.ndarray: One return per position closed at a positive balance, ordered by the date
+                    the position was last traded.
+    """
+    deposit = df.loc[df['type'] == 2, 'profit'].sum()
+    trades = df.loc[df['type'] != 2]
+
+    # Net P&L per position, ordered by its last deal
+    positions = pd.DataFrame({
+        'position_id': trades['position_id'],
+        'date': trades['date'],
+        'pnl': trades['profit'] + trades['swap'] + trades['commission'] + trades['fee'],
+    }).groupby('position_id').agg(date=('date', 'max'), pnl=('pnl', 'sum')).sort_values('date', kind='stable')
+
+    pnl = positions['pnl'].to_numpy()
+    opening_balance = deposit + np.cumsum(pnl) - pnl
+    return _returns(pnl, opening_balance)
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """
+    Return the shared worker pool, replacing it when a run needs more workers than it has.
+    Batches already submitted to a replaced pool still complete.
+    """
+    with _pool_lock:
+        if _pool['workers'] < workers:
+            if _pool['executor'] is not None:
+                _pool['executor'].shutdown(wait=False)
+            _pool['executor'] = ProcessPoolExecutor(max_workers=workers)
+            _pool['workers'] = workers
+        return _pool['executor']
+
+
+def _simulate_batch(returns: np.ndarray, n_paths: int, horizon: int, start_balance: float,
+                    seed: np.random.SeedSequence, sample_paths: int) -> Dict[str, np.ndarray]:
+    """
+    Simulate one batch of equity paths.
+
+    Returns:
+        Dict[str, np.ndarray]: 'terminal' balances, 'max_drawdown' fractions and the first
+                               `sample_paths` full paths (including the start balance).
+    """
+    rng = np.random.default_rng(seed)
+
+    # paths x steps matrix of resampled returns, compounded along the steps
+    sampled = returns[rng.integers(0, len(returns), size=(n_paths, horizon))]
+    equity = np.empty((n_paths, horizon + 1))
+    equity[:, 0] = start_balance
+    np.cumprod(1.0 + sampled, axis=1, out=equity[:, 1:])
+    equity[:, 1:] *= start_balance
+
+    # Maximum drawdown from the running peak of every path
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity, axis=1)
+
+    return {
+        'terminal': equity[:, -1],
+        'max_drawdown': drawdown.max(axis=1),
+        'sample_paths': equity[:sample_paths],
+    }
+
+
+def simulate_equity_paths(returns: np.ndarray,
+                          start_balance: float,
+                          n_paths: int = config.MC_PATHS,
+                          horizon: Optional[int] = None,
+                          seed: Optional[int] = None,
+                          workers: Optional[int] = config.MC_WORKERS,
+                          batch_size: int = config.MC_BATCH_SIZE,
+                          sample_paths: int = 100) -> Dict[str, np.ndarray]:
+    """
+    Bootstrap returns into equity paths, in batches sharded across worker processes.
+
+    Args:
+        returns (np.ndarray): Realized returns to resample, see `daily_returns` and `trade_returns`.
+        start_balance (float): Balance every path starts from.
+        n_paths (int): Number of simulated paths. Default is config.MC_PATHS.
+        horizon (int, optional): Number of resampled returns per path. Default is len(returns).
+        seed (int, optional): Seed for reproducible results.
+        workers (int, optional): Number of worker processes; 1 runs in-process, None uses all CPUs.
+        batch_size (int): Number of paths per batch. Default is config.MC_BATCH_SIZE.
+        sample_paths (int): Number of full paths kept for plotting.
+
+    Returns:
+        Dict[str, np.ndarray]: 'terminal' balances and 'max_drawdown' fractions of every path,
+                               and 'sample_paths' (sample_paths x horizon + 1 balances).
+
+    Raises:
+        ValueError: If there are no returns to resample.
+
+    Example:
+        >>> result = simulate_equity_paths(daily_returns(df), start_balance=1000, n_paths=10_000, seed=1)
+        >>> simulation_summary(result)
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.size == 0:
+        raise ValueError("No returns to resample")
+
+    horizon = horizon or len(returns)
+    batches = [min(batch_size, n_paths - start) for start in range(0, n_paths, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    samples = [sample_paths] + [0] * (len(batches) - 1)
+
+    arguments = ([returns] * len(batches), batches, [horizon] * len(batches),
+                 [start_balance] * len(batches), seeds, samples)
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+
+    if workers == 1:
+        results = list(map(_simulate_batch, *arguments))
+    else:
+        results = list(_executor(workers).map(_simulate_batch, *arguments))
+
+    return {
+        'terminal': np.concatenate([result['terminal'] for result in results]),
+        'max_drawdown': np.concatenate([result['max_drawdown'] for result in results]),
+        'sample_paths': results[0]['sample_paths'],
+    }
+
+
+def simulation_summary(result: Dict[str, np.ndarray], percentiles: Iterable[float] = (5, 25, 50, 75, 95)) -> pd.DataFrame:
+    """
+    Summarize a simulation as terminal-balance and maximum-drawdown percentiles.
+
+    Args:
+        result (Dict[str, np.ndarray]): Output of `simulate_equity_paths`.
+        percentiles (Iterable[float]): Percentiles to report.
+
+    Returns:
+        pd.DataFrame: One row per percentile with 'terminal_balance' and 'max_drawdown_%' columns.
+    """
+    percentiles = list(percentiles)
+    return pd.DataFrame({
+        'percentile': percentiles,
+        'terminal_balance': np.round(np.percentile(result['terminal'], percentiles), 2),
+        'max_drawdown_%': np.round(np.percentile(result['max_drawdown'], percentiles) * 100, 1),
+    })
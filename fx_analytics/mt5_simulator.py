@@ -0,0 +1,401 @@
+"""
+Local stand-in for the MetaTrader5 package.
+
+The real MetaTrader5 package only works on Windows with a running terminal. This module
+implements the subset of its API used by `main_functions` (`initialize`, `login`,
+`history_deals_get`, `history_orders_get`, `copy_rates_range`, `last_error` and `shutdown`) and
+serves synthetic deal and order histories and daily bars, so the ETL path can be exercised and
+benchmarked anywhere. Deals and orders of the same period are consistent: every trade deal is
+filled from one order, with a simulated fill latency and slippage.
+
+Example:
+    >>> from fx_analytics import mt5_simulator
+    >>> mt5_simulator.install()
+    >>> mt5_simulator.configure(deals=50_000, latency=0.05, failure_rate=0.1)
+    >>> from fx_analytics.main_functions import ETL
+    >>> df = ETL('2023-09-24', {'login': 1, 'server': 'sim', 'password': 'sim'})
+"""
+import sys
+import time as _time
+from collections import namedtuple
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+
+__author__ = "fx_analytics"
+__version__ = "5.0.0-sim"
+
+# result codes, same values as the real package
+RES_S_OK = 1
+RES_E_FAIL = -1
+RES_E_INVALID_PARAMS = -2
+RES_E_NOT_FOUND = -4
+RES_E_AUTH_FAILED = -6
+RES_E_INTERNAL_FAIL_TIMEOUT = -10005
+
+# timeframes
+TIMEFRAME_D1 = 16408
+
+# deal types and entries used by the synthetic stream
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_TYPE_BALANCE = 2
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+
+# order states used by the synthetic history
+ORDER_STATE_FILLED = 4
+
+# same field order as MetaTrader5.TradeDeal
+TradeDeal = namedtuple('TradeDeal', ['ticket', 'order', 'time', 'time_msc', 'type', 'entry',
+                                     'magic', 'position_id', 'reason', 'volume', 'price',
+                                     'commission', 'swap', 'profit', 'fee', 'symbol',
+                                     'comment', 'external_id'])
+
+# same field order as MetaTrader5.TradeOrder
+TradeOrder = namedtuple('TradeOrder', ['ticket', 'time_setup', 'time_setup_msc', 'time_done',
+                                       'time_done_msc', 'time_expiration', 'type', 'type_time',
+                                       'type_filling', 'state', 'magic', 'position_id',
+                                       'position_by_id', 'reason', 'volume_initial',
+                                       'volume_current', 'price_open', 'sl', 'tp', 'price_current',
+                                       'price_stoplimit', 'symbol', 'comment', 'external_id'])
+
+# symbol -> (reference price, price volatility per deal)
+SYMBOLS = {
+    'XAUUSD': (1900.0, 2.0),
+    'GBPJPY': (182.0, 0.15),
+    'GBPUSD': (1.22, 0.001),
+    'EURGBP': (0.87, 0.0008),
+    'EURUSD': (1.06, 0.005),
+}
+
+_DEFAULT_SETTINGS = {
+    'deals': 10_000,        # number of deals served by history_deals_get
+    'latency': 0.0,         # seconds slept on every API call
+    'failure_rate': 0.0,    # probability that a call fails
+    'deposit': 1000.0,      # balance deal placed at the start of the stream
+    'symbols': ('XAUUSD', 'GBPJPY', 'GBPUSD', 'EURGBP'),
+    'seed': None,
+}
+
+_settings = dict(_DEFAULT_SETTINGS)
+_state = {'initialized': False, 'logged_in': False, 'last_error': (RES_S_OK, 'Success'), 'injected_failures': 0}
+_rng = np.random.default_rng()
+# entropy of the generated histories, so deals and orders of a period match across calls
+_history_entropy = np.random.SeedSequence().entropy
+# last generated history, keyed on the settings and period: deals and orders of one ETL run are
+# generated once, so the configured latency is the only simulated cost of the history calls
+_history_cache = {}
+
+
+def configure(**settings) -> dict:
+    """
+    Change the behaviour of the simulator.
+
+    Args:
+        **settings: Any of 'deals', 'latency', 'failure_rate', 'deposit', 'symbols' and 'seed'.
+                    Settings that are not passed keep their current value.
+
+    Returns:
+        dict: The settings now in effect.
+
+    Raises:
+        ValueError: If an unknown setting or an invalid value is passed.
+    """
+    global _rng, _history_entropy
+
+    unknown = set(settings) - set(_DEFAULT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown simulator settings: {sorted(unknown)}")
+    if not 0.0 <= settings.get('failure_rate', 0.0) <= 1.0:
+        raise ValueError("failure_rate must be between 0 and 1")
+    if settings.get('deals', 0) < 0:
+        raise ValueError("deals must be non-negative")
+
+    _settings.update(settings)
+    _rng = np.random.default_rng(_settings['seed'])
+    _history_entropy = np.random.SeedSequence(_settings['seed']).entropy
+    return dict(_settings)
+
+
+def reset() -> None:
+    """
+    Restore the default settings and disconnect.
+    """
+    _settings.clear()
+    _settings.update(_DEFAULT_SETTINGS)
+    _history_cache.clear()
+    configure()
+    _state.update(initialized=False, logged_in=False, last_error=(RES_S_OK, 'Success'), injected_failures=0)
+
+
+def install() -> None:
+    """
+    Register this module as `MetaTrader5` so that `import MetaTrader5` resolves to the simulator.
+
+    Must be called before `fx_analytics.main_functions` is imported.
+    """
+    sys.modules['MetaTrader5'] = sys.modules[__name__]
+
+
+def _call(error: Tuple[int, str]) -> bool:
+    """
+    Apply the configured latency and decide whether the current call fails.
+
+    Returns:
+        bool: True if the call succeeds, False if it fails (last_error is set accordingly).
+    """
+    if _settings['latency']:
+        _time.sleep(_settings['latency'])
+
+    if _settings['failure_rate'] and _rng.random() < _settings['failure_rate']:
+        _state['last_error'] = error
+        _state['injected_failures'] += 1
+        return False
+
+    _state['last_error'] = (RES_S_OK, 'Success')
+    return True
+
+
+def initialize(*args, **kwargs) -> bool:
+    """
+    Connect to the (simulated) terminal.
+    """
+    _state['initialized'] = _call((RES_E_INTERNAL_FAIL_TIMEOUT, 'IPC timeout'))
+    return _state['initialized']
+
+
+def login(login=None, password=None, server=None, timeout=None) -> bool:
+    """
+    Log in to the (simulated) trading account.
+    """
+    if not _state['initialized']:
+        _state['last_error'] = (RES_E_FAIL, 'Terminal not initialized')
+        return False
+
+    _state['logged_in'] = _call((RES_E_AUTH_FAILED, 'Authorization failed'))
+    return _state['logged_in']
+
+
+def injected_failures() -> int:
+    """
+    Return the number of calls failed on purpose (by `failure_rate`) since the last reset.
+    """
+    return _state['injected_failures']
+
+
+def last_error() -> Tuple[int, str]:
+    """
+    Return the result of the last call as a (code, description) tuple.
+    """
+    return _state['last_error']
+
+
+def shutdown() -> None:
+    """
+    Close the connection to the (simulated) terminal.
+    """
+    _state.update(initialized=False, logged_in=False)
+
+
+def _to_timestamp(value) -> int:
+    # history functions accept datetime objects or unix timestamps
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _history(start: int, end: int) -> Tuple[tuple, tuple]:
+    """
+    Return the deal and order history of a period, generating it only if the settings or the
+    period changed since the last call.
+    """
+    key = (_history_entropy, _settings['deals'], _settings['deposit'], tuple(_settings['symbols']), start, end)
+    if key not in _history_cache:
+        _history_cache.clear()
+        _history_cache[key] = _generate_history(start, end)
+    return _history_cache[key]
+
+
+def _generate_history(start: int, end: int) -> Tuple[tuple, tuple]:
+    """
+    Generate the deal and order history of a period.
+
+    The stream starts with one balance deal followed by opening/closing deal pairs for
+    randomly drawn positions, sorted by time. The history only depends on the settings and the
+    period, so `history_deals_get` and `history_orders_get` return matching records.
+
+    Returns:
+        Tuple[tuple, tuple]: The TradeDeal and the TradeOrder records.
+    """
+    rng = np.random.default_rng([_history_entropy, start, end])
+    n_deals = _settings['deals']
+    if n_deals == 0:
+        return (), ()
+
+    # one balance deal, the rest are in/out pairs
+    n_positions = (n_deals - 1) // 2
+    n_trade_deals = n_deals - 1
+    symbols = np.array(_settings['symbols'], dtype=object)
+
+    # times: the balance deal first, then sorted open/close times per position
+    open_times = np.sort(rng.integers(start, max(end, start + 1), n_positions))
+    hold = rng.integers(1, 4 * 3600, n_positions)
+    close_times = np.minimum(open_times + hold, end)
+
+    position_ids = np.arange(n_positions, dtype=np.int64) + 600_000_000
+    position_symbols = symbols[rng.integers(0, len(symbols), n_positions)]
+    position_side = rng.integers(0, 2, n_positions)
+    position_volume = np.round(rng.choice([0.01, 0.02, 0.03, 0.05, 0.1], n_positions), 2)
+
+    reference = np.array([SYMBOLS.get(s, (1.0, 0.001))[0] for s in position_symbols])
+    volatility = np.array([SYMBOLS.get(s, (1.0, 0.001))[1] for s in position_symbols])
+    open_price = reference + rng.normal(0.0, 20.0, n_positions) * volatility
+    close_price = open_price + rng.normal(0.0, 3.0, n_positions) * volatility
+    direction = np.where(position_side == DEAL_TYPE_BUY, 1.0, -1.0)
+    profit = np.round(direction * (close_price - open_price) / volatility * position_volume * 10, 2)
+    commission = np.round(-position_volume * 2.8, 2)
+
+    # interleave opening and closing deals: [open_0, close_0, open_1, close_1, ...]
+    pair = lambda opening, closing: np.column_stack([opening, closing]).ravel()
+    times = pair(open_times, close_times)[:n_trade_deals]
+    types = pair(position_side, 1 - position_side)[:n_trade_deals]
+    entries = pair(np.full(n_positions, DEAL_ENTRY_IN), np.full(n_positions, DEAL_ENTRY_OUT))[:n_trade_deals]
+    positions = np.repeat(position_ids, 2)[:n_trade_deals]
+    deal_symbols = np.repeat(position_symbols, 2)[:n_trade_deals]
+    volumes = np.repeat(position_volume, 2)[:n_trade_deals]
+    prices = pair(np.round(open_price, 5), np.round(close_price, 5))[:n_trade_deals]
+    profits = pair(np.zeros(n_positions), profit)[:n_trade_deals]
+    commissions = np.repeat(commission, 2)[:n_trade_deals]
+
+    # odd deal counts leave one unpaired closing deal: attach it to a fresh position
+    if n_trade_deals > 2 * n_positions:
+        times = np.append(times, end)
+        types = np.append(types, DEAL_TYPE_SELL)
+        entries = np.append(entries, DEAL_ENTRY_OUT)
+        positions = np.append(positions, position_ids[-1] + 1 if n_positions else 600_000_000)
+        deal_symbols = np.append(deal_symbols, symbols[0])
+        volumes = np.append(volumes, 0.01)
+        prices = np.append(prices, SYMBOLS.get(symbols[0], (1.0, 0.001))[0])
+        profits = np.append(profits, 0.0)
+        commissions = np.append(commissions, -0.03)
+
+    order = np.argsort(times, kind='stable')
+    tickets = np.arange(n_trade_deals, dtype=np.int64) + 500_000_001
+    times, types, positions, volumes, prices, deal_symbols = (times[order], types[order], positions[order],
+                                                               volumes[order], prices[order], deal_symbols[order])
+
+    # every trade deal fills one market order placed shortly before, at a slightly different price
+    latency_ms = np.round(rng.lognormal(4.5, 0.8, n_trade_deals)).astype(np.int64)
+    deal_volatility = np.array([SYMBOLS.get(s, (1.0, 0.001))[1] for s in deal_symbols])
+    slippage = rng.normal(0.002, 0.01, n_trade_deals) * deal_volatility
+    requested = np.round(prices - np.where(types == DEAL_TYPE_BUY, 1.0, -1.0) * slippage, 5)
+
+    deals = [TradeDeal(500_000_000, 0, start, start * 1000, DEAL_TYPE_BALANCE, 0, 0, 0, 0,
+                       0.0, 0.0, 0.0, 0.0, float(_settings['deposit']), 0.0, '', 'Deposit', '')]
+    deals.extend(
+        TradeDeal(int(ticket), int(ticket) + 100_000_000, int(t), int(t) * 1000, int(kind), int(entry),
+                  0, int(position), 0, float(volume), float(price), float(fee_commission), 0.0,
+                  float(pnl), 0.0, symbol, '', str(ticket))
+        for ticket, t, kind, entry, position, volume, price, fee_commission, pnl, symbol in zip(
+            tickets, times, types, entries[order], positions, volumes,
+            prices, commissions[order], profits[order], deal_symbols)
+    )
+    orders = [
+        TradeOrder(int(ticket) + 100_000_000, (int(t) * 1000 - int(delay)) // 1000, int(t) * 1000 - int(delay),
+                   int(t), int(t) * 1000, 0, int(kind), 0, 0, ORDER_STATE_FILLED, 0, int(position), 0, 0,
+                   float(volume), 0.0, float(price), 0.0, 0.0, float(price), 0.0, symbol, '', '')
+        for ticket, t, delay, kind, position, volume, price, symbol in zip(
+            tickets, times, latency_ms, types, positions, volumes, requested, deal_symbols)
+    ]
+    return tuple(deals), tuple(orders)
+
+
+def history_deals_get(date_from=None, date_to=None, group: Optional[str] = None, **kwargs) -> Optional[tuple]:
+    """
+    Return a synthetic deal history between two dates.
+
+    The stream starts with one balance deal followed by opening/closing deal pairs for
+    randomly drawn positions, sorted by time (see `_generate_history`). The history of a period
+    is generated once and reused by later calls with the same settings.
+
+    Args:
+        date_from (datetime | int): Start of the requested period.
+        date_to (datetime | int): End of the requested period.
+        group (str, optional): Accepted for API compatibility, ignored.
+
+    Returns:
+        tuple | None: A tuple of TradeDeal records, or None if the call fails.
+    """
+    if not _state['logged_in']:
+        _state['last_error'] = (RES_E_FAIL, 'Not logged in')
+        return None
+    if date_from is None or date_to is None:
+        _state['last_error'] = (RES_E_INVALID_PARAMS, 'Invalid arguments')
+        return None
+    if not _call((RES_E_INTERNAL_FAIL_TIMEOUT, 'IPC timeout')):
+        return None
+
+    return _history(_to_timestamp(date_from), _to_timestamp(date_to))[0]
+
+
+def history_orders_get(date_from=None, date_to=None, group: Optional[str] = None, **kwargs) -> Optional[tuple]:
+    """
+    Return the synthetic orders between two dates: one filled market order per trade deal
+    returned by `history_deals_get` for the same period.
+
+    Args:
+        date_from (datetime | int): Start of the requested period.
+        date_to (datetime | int): End of the requested period.
+        group (str, optional): Accepted for API compatibility, ignored.
+
+    Returns:
+        tuple | None: A tuple of TradeOrder records, or None if the call fails.
+    """
+    if not _state['logged_in']:
+        _state['last_error'] = (RES_E_FAIL, 'Not logged in')
+        return None
+    if date_from is None or date_to is None:
+        _state['last_error'] = (RES_E_INVALID_PARAMS, 'Invalid arguments')
+        return None
+    if not _call((RES_E_INTERNAL_FAIL_TIMEOUT, 'IPC timeout')):
+        return None
+
+    return _history(_to_timestamp(date_from), _to_timestamp(date_to))[1]
+
+
+def copy_rates_range(symbol: str, timeframe: int, date_from, date_to) -> Optional[np.ndarray]:
+    """
+    Return synthetic daily bars of a symbol between two dates.
+
+    Only TIMEFRAME_D1 and the symbols in SYMBOLS are supported; other requests fail like
+    an unknown symbol on the real terminal.
+
+    Returns:
+        np.ndarray | None: A structured array with the fields of MT5 rate bars, or None.
+    """
+    if not _state['logged_in']:
+        _state['last_error'] = (RES_E_FAIL, 'Not logged in')
+        return None
+    if symbol not in SYMBOLS or timeframe != TIMEFRAME_D1:
+        _state['last_error'] = (RES_E_NOT_FOUND, 'Terminal: Not found')
+        return None
+    if not _call((RES_E_INTERNAL_FAIL_TIMEOUT, 'IPC timeout')):
+        return None
+
+    start, end = _to_timestamp(date_from) // 86400, _to_timestamp(date_to) // 86400
+    days = np.arange(start, end + 1, dtype=np.int64)
+    reference, volatility = SYMBOLS[symbol]
+
+    # random walk of daily closes around the reference price
+    close = reference + np.cumsum(_rng.normal(0.0, volatility, len(days)))
+    bars = np.zeros(len(days), dtype=[('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                                      ('close', '<f8'), ('tick_volume', '<u8'), ('spread', '<i4'),
+                                      ('real_volume', '<u8')])
+    bars['time'] = days * 86400
+    bars['open'] = np.concatenate([[reference], close[:-1]])
+    bars['close'] = close
+    bars['high'] = np.maximum(bars['open'], close) + volatility
+    bars['low'] = np.minimum(bars['open'], close) - volatility
+    return bars
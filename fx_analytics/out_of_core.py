@@ -0,0 +1,129 @@
+"""
+Bounded-memory aggregation of deal histories that do not fit into RAM.
+
+The deal file is streamed in chunks and every chunk is reduced to a compact aggregate with
+one row per (date, type, symbol) and, when intraday time is available, per hour bucket. The
+aggregate keeps the summed 'profit', 'swap', 'commission' and 'fee' plus a 'deals' count, so
+weekly, monthly and per-symbol figures can be derived from it exactly. Its size depends on the
+number of trading days and symbols, not on the number of deals. Deals of consolidated accounts
+are kept apart per 'currency' so the aggregate can still be converted to a reporting currency.
+
+The sum-based dashboard functions (`get_portfolio_growth`, `weekly_percentage_growth`,
+`monthly_percentage_growth`, `create_growth_chart`) accept the aggregate as is; count-based
+functions weight rows by its 'deals' column.
+"""
+from typing import Optional, Tuple
+import pandas as pd
+from loguru import logger
+from fx_analytics import config
+from fx_analytics.data_store import iter_deal_chunks
+from fx_analytics.time_analytics import add_time_buckets
+
+SUM_COLUMNS = ['profit', 'swap', 'commission', 'fee']
+BUCKET_COLUMNS = ['hour', 'weekday', 'session']
+# every key an aggregate can be grouped by; 'date', 'type' and 'symbol' are always present
+AGGREGATE_KEYS = ['date', 'type', 'symbol'] + BUCKET_COLUMNS + ['currency']
+
+# columns read from the deal file
+READ_COLUMNS = ['date', 'time', 'type', 'entry', 'symbol', 'position_id', 'currency'] + SUM_COLUMNS + BUCKET_COLUMNS
+
+# deal entry that opens a position (DEAL_ENTRY_IN)
+ENTRY_IN = 0
+
+
+def aggregate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce a chunk of deals to summed P&L columns and a deal count per aggregation key.
+
+    Args:
+        chunk (pd.DataFrame): Deals with 'date', 'type', 'symbol' and the SUM_COLUMNS.
+
+    Returns:
+        pd.DataFrame: The partial aggregate, indexed by 'date', 'type', 'symbol' and the
+                      available time bucket columns.
+    """
+    # Derive the time buckets if the file predates them
+    if 'hour' not in chunk.columns and 'time' in chunk.columns:
+        chunk = add_time_buckets(chunk)
+
+    # consolidated accounts: amounts in different currencies must not be summed together
+    keys = [column for column in AGGREGATE_KEYS if column in chunk.columns]
+    chunk = chunk.assign(symbol=chunk['symbol'].fillna(''), deals=1)
+
+    # keep rows with missing keys (e.g. no currency) instead of silently dropping them
+    return chunk.groupby(by=keys, dropna=False)[SUM_COLUMNS + ['deals']].sum()
+
+
+def count_trades(chunk: pd.DataFrame) -> int:
+    """
+    Count the trades opened in a chunk of deals.
+
+    A trade is a position opened in the history: a buy or sell deal with entry in. Every
+    position has exactly one such deal, so the count needs no state across chunks, and
+    `app.total_trades` uses the same definition for the in-memory deals. Files without an
+    'entry' column fall back to the unique position IDs of the buy deals, which is exact as
+    long as a position does not span chunks.
+
+    Args:
+        chunk (pd.DataFrame): Deals with 'type' and 'entry' (or 'position_id') columns.
+
+    Returns:
+        int: The number of trades.
+    """
+    if 'entry' in chunk.columns:
+        return int((chunk['type'].isin([0, 1]) & (chunk['entry'] == ENTRY_IN)).sum())
+    return chunk.loc[chunk['type'] == 0, 'position_id'].nunique()
+
+
+def merge_aggregates(aggregate: Optional[pd.DataFrame], partial: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge a partial aggregate into the running aggregate by adding rows with equal keys.
+
+    Args:
+        aggregate (pd.DataFrame | None): The running aggregate, None before the first chunk.
+        partial (pd.DataFrame): The aggregate of the next chunk.
+
+    Returns:
+        pd.DataFrame: The merged aggregate.
+    """
+    if aggregate is None:
+        return partial
+    return pd.concat([aggregate, partial]).groupby(level=list(partial.index.names), dropna=False).sum()
+
+
+def aggregate_deals(data_file_path: str, chunksize: int = config.CHUNK_SIZE) -> Tuple[pd.DataFrame, int]:
+    """
+    Stream a deal file in chunks and merge the partial aggregates.
+
+    Peak memory is bounded by `chunksize` and the size of the aggregate (trading days x
+    symbols x deal types x hours), not by the number of deals. Trades are counted per chunk
+    with `count_trades`, so no per-trade state is kept.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+        chunksize (int): Number of rows read per chunk. Default is config.CHUNK_SIZE.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: The aggregate with columns 'date', 'type', 'symbol', the
+                                  available time buckets, 'profit', 'swap', 'commission', 'fee'
+                                  and 'deals', and the number of trades (see `count_trades`).
+
+    Example:
+        >>> aggregate, trades = aggregate_deals('fx_history.csv', chunksize=100_000)
+        >>> get_portfolio_growth(aggregate, profit=False)
+    """
+    aggregate = None
+    trades = 0
+    rows = 0
+
+    for chunk in iter_deal_chunks(data_file_path, chunksize, columns=READ_COLUMNS):
+        aggregate = merge_aggregates(aggregate, aggregate_chunk(chunk))
+        trades += count_trades(chunk)
+        rows += len(chunk)
+
+    if aggregate is None:
+        raise ValueError(f"No deals found in {data_file_path}")
+
+    logger.info("Aggregated {} deals into {} rows", rows, len(aggregate))
+
+    return aggregate.reset_index(), trades
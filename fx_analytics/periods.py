@@ -0,0 +1,192 @@
+"""
+One-pass period engine: daily, weekly, monthly, quarterly and yearly P&L, balance and
+percentage growth.
+
+Deals are collapsed to daily P&L once; every frequency is then derived from the (small) daily
+arrays with integer period codes computed by NumPy datetime arithmetic, instead of
+re-deriving week/month/year columns with `.dt` accessors and grouping on string keys.
+
+Period codes:
+    daily      days since 1970-01-01
+    weekly     ISO weeks (Monday to Sunday) since the week of 1970-01-01
+    monthly    months since 1970-01
+    quarterly  quarters since 1970-Q1
+    yearly     years since 1970
+"""
+from typing import Dict, Iterable, Tuple
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = ['daily', 'weekly', 'monthly', 'quarterly', 'yearly']
+
+
+def daily_pnl(df: pd.DataFrame) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Collapse deals to the deposit total and the net P&L of every trading day.
+
+    Args:
+        df (pd.DataFrame): Raw or aggregated deals with 'date', 'type', 'profit', 'swap',
+                           'commission' and 'fee' columns.
+
+    Returns:
+        Tuple[float, np.ndarray, np.ndarray]: The deposit total (sum of type 2 profit), the sorted
+                                              trading days as day codes and their net P&L.
+    """
+    deposit = df.loc[df['type'] == 2, 'profit'].sum()
+    trades = df.loc[df['type'] != 2]
+
+    pnl = (trades['profit'] + trades['swap'] + trades['commission'] + trades['fee']).to_numpy()
+    days = pd.to_datetime(trades['date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    # Sum P&L per day with one bincount over the day codes
+    unique_days, day_index = np.unique(days, return_inverse=True)
+
+    return deposit, unique_days, np.bincount(day_index, weights=pnl, minlength=len(unique_days))
+
+
+def _period_codes(days: np.ndarray, frequency: str) -> np.ndarray:
+    """
+    Map day codes to the integer period codes of a frequency.
+    """
+    if frequency == 'daily':
+        return days
+    if frequency == 'weekly':
+        # 1970-01-01 was a Thursday: shifting by 3 days aligns week boundaries on Mondays
+        return (days + 3) // 7
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if frequency == 'monthly':
+        return months
+    if frequency == 'quarterly':
+        return months // 3
+    if frequency == 'yearly':
+        return months // 12
+    raise ValueError(f"Unknown frequency '{frequency}', expected one of {FREQUENCIES}")
+
+
+def _period_starts(codes: np.ndarray, frequency: str) -> pd.DatetimeIndex:
+    """
+    Return the first day of every period code.
+    """
+    if frequency == 'daily':
+        starts = codes.astype('datetime64[D]')
+    elif frequency == 'weekly':
+        starts = (codes * 7 - 3).astype('datetime64[D]')
+    elif frequency == 'monthly':
+        starts = codes.astype('datetime64[M]')
+    elif frequency == 'quarterly':
+        starts = (codes * 3).astype('datetime64[M]')
+    else:
+        starts = (codes * 12).astype('datetime64[M]')
+    return pd.DatetimeIndex(starts.astype('datetime64[ns]'))
+
+
+def _period_labels(starts: pd.DatetimeIndex, frequency: str) -> pd.Index:
+    """
+    Format display labels, computed once per period rather than per deal.
+    """
+    if frequency == 'daily':
+        return starts.strftime('%Y-%m-%d')
+    if frequency == 'weekly':
+        calendar = starts.isocalendar()
+        return calendar['week'].astype(str) + '-' + calendar['year'].astype(str)
+    if frequency == 'monthly':
+        return starts.month.astype(str) + '-' + starts.year.astype(str)
+    if frequency == 'quarterly':
+        return 'Q' + starts.quarter.astype(str) + '-' + starts.year.astype(str)
+    return starts.year.astype(str)
+
+
+def periods_from_daily(days: np.ndarray,
+                       pnl: np.ndarray,
+                       start_balance: float,
+                       frequencies: Iterable[str] = FREQUENCIES) -> Dict[str, pd.DataFrame]:
+    """
+    Aggregate daily P&L into periods and compute balance and percentage growth.
+
+    Args:
+        days (np.ndarray): Sorted day codes (days since 1970-01-01) of the trading days.
+        pnl (np.ndarray): Net P&L of every trading day.
+        start_balance (float): Balance before the first trading day (the deposits).
+        frequencies (Iterable[str]): Frequencies to compute, from FREQUENCIES.
+
+    Returns:
+        Dict[str, pd.DataFrame]: One table per frequency in chronological order, with the columns
+                                 'period' (integer period code), 'start' (first day of the period),
+                                 'label', 'total_profit', 'balance' (closing balance), 'growth_%'
+                                 (profit relative to the opening balance) and a bar 'color'.
+    """
+    tables = {}
+    for frequency in frequencies:
+        codes = _period_codes(days, frequency)
+
+        # days are sorted, so equal period codes are contiguous
+        periods, period_index = np.unique(codes, return_inverse=True)
+        total_profit = np.bincount(period_index, weights=pnl, minlength=len(periods))
+        balance = start_balance + np.cumsum(total_profit)
+        opening_balance = balance - total_profit
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.round(total_profit / opening_balance, 3) * 100
+
+        starts = _period_starts(periods, frequency)
+        tables[frequency] = pd.DataFrame({
+            'period': periods,
+            'start': starts,
+            'label': np.asarray(_period_labels(starts, frequency)),
+            'total_profit': total_profit,
+            'balance': balance,
+            'growth_%': growth,
+            'color': np.where(total_profit >= 0, 'green', 'red'),
+        })
+
+    return tables
+
+
+def growth_against_account(tables: Dict[str, pd.DataFrame], account: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Express the growth of part of the account (e.g. one symbol) relative to the account balance.
+
+    A symbol has no balance of its own, so its 'growth_%' is its period profit relative to the
+    opening balance of the whole account in that period.
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): Period tables of the part, see `periods_from_daily`.
+        account (Dict[str, pd.DataFrame]): Period tables of the whole account, with every
+                                           frequency of `tables`.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Copies of `tables` with the 'growth_%' column recomputed.
+    """
+    result = {}
+    for frequency, table in tables.items():
+        periods = account[frequency]
+
+        # the part trades on a subset of the account's days, so every period code is found
+        at = np.searchsorted(periods['period'].to_numpy(), table['period'].to_numpy())
+        opening_balance = (periods['balance'] - periods['total_profit']).to_numpy()[at]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.round(table['total_profit'].to_numpy() / opening_balance, 3) * 100
+        result[frequency] = table.assign(**{'growth_%': growth})
+
+    return result
+
+
+def period_growth(df: pd.DataFrame, frequencies: Iterable[str] = FREQUENCIES) -> Dict[str, pd.DataFrame]:
+    """
+    Compute P&L, balance and percentage growth for several frequencies in one pass over the deals.
+
+    Args:
+        df (pd.DataFrame): Raw or aggregated deals with 'date', 'type', 'profit', 'swap',
+                           'commission' and 'fee' columns.
+        frequencies (Iterable[str]): Frequencies to compute, from FREQUENCIES.
+
+    Returns:
+        Dict[str, pd.DataFrame]: One table per frequency, see `periods_from_daily`.
+
+    Example:
+        >>> tables = period_growth(df)
+        >>> tables['quarterly'][['label', 'total_profit', 'growth_%']]
+    """
+    deposit, days, pnl = daily_pnl(df)
+    return periods_from_daily(days, pnl, deposit, frequencies)
@@ -0,0 +1,94 @@
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from fx_analytics.periods import growth_against_account, periods_from_daily
+
+# key of the rollup covering every symbol
+ALL_SYMBOLS = 'All'
+
+
+def _symbol_view(daily: pd.DataFrame, start_balance: float, account: Optional[Dict] = None) -> Dict:
+    """
+    Build the panel inputs of one symbol (or of all symbols) from its daily rollup.
+
+    Args:
+        daily (pd.DataFrame): Daily rollup indexed by date, with 'total_profit' and 'trades' columns.
+        start_balance (float): Balance the growth curve starts from.
+        account (Dict, optional): Period tables of the whole account; the percentage growth of
+                                  a symbol view is relative to the account balance.
+
+    Returns:
+        Dict: The 'growth', 'profit' and 'trades' panel data and 'periods', the period engine
+              tables of every frequency.
+    """
+    daily = daily.reset_index()
+
+    # Every frequency from the daily rollup, in one pass of the period engine
+    days = daily['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    periods = periods_from_daily(days, daily['total_profit'].to_numpy(), start_balance)
+    if account is not None:
+        periods = growth_against_account(periods, account)
+
+    # Balance growth and daily profit, latest date first like get_portfolio_growth
+    growth = pd.DataFrame({'date': daily['date'],
+                           'daily_profit': daily['total_profit'],
+                           'growth': periods['daily']['balance']})
+    profit = pd.DataFrame({'date': daily['date'], 'growth': daily['total_profit']})
+
+    # Number of trades opened per day, only days with trades
+    trades = daily.loc[daily['trades'] > 0, ['date', 'trades']].rename(columns={'trades': 'count'})
+
+    return {
+        'growth': growth.iloc[::-1].reset_index(drop=True),
+        'profit': profit.iloc[::-1].reset_index(drop=True),
+        'trades': trades.reset_index(drop=True),
+        'periods': periods,
+    }
+
+
+def build_symbol_rollups(df: pd.DataFrame) -> Dict:
+    """
+    Precompute per-symbol row indices and panel rollups.
+
+    The deals are grouped by symbol and date once; every symbol view (and the view over all
+    symbols) is then derived from that small daily rollup. Build it once per data version,
+    so switching the selected symbol in the dashboard is a dictionary lookup.
+
+    Args:
+        df (pd.DataFrame): The deals, with at least 'date', 'type', 'symbol', 'profit', 'swap',
+                           'commission' and 'fee' columns, or the aggregate of `out_of_core.aggregate_deals`.
+
+    Returns:
+        Dict: 'symbols' (sorted list of traded symbols), 'rows' (symbol -> array of row positions
+              in df) and 'views' (symbol or ALL_SYMBOLS -> panel data, see `_symbol_view`).
+
+    Example:
+        >>> rollups = build_symbol_rollups(df)
+        >>> rollups['views']['XAUUSD']['growth'].head()
+    """
+    # Deposits (type 2) are not trades; they only set the starting balance
+    deposit = df.loc[df['type'] == 2, 'profit'].sum()
+    trades = df.loc[df['type'] != 2]
+
+    keyed = pd.DataFrame({
+        'symbol': trades['symbol'].fillna(''),
+        'date': pd.to_datetime(trades['date']),
+        'total_profit': trades['profit'] + trades['swap'] + trades['commission'] + trades['fee'],
+        'trades': (trades['type'] == 0) * (trades['deals'] if 'deals' in trades.columns else 1),
+    })
+
+    # One grouped pass over the deals: daily profit and trade count per symbol
+    daily = keyed.groupby(by=['symbol', 'date'])[['total_profit', 'trades']].sum()
+
+    views = {ALL_SYMBOLS: _symbol_view(daily.groupby(level='date').sum(), deposit)}
+    for symbol, symbol_daily in daily.groupby(level='symbol'):
+        views[symbol] = _symbol_view(symbol_daily.droplevel('symbol'), 0.0, views[ALL_SYMBOLS]['periods'])
+
+    # Row positions of every symbol in the original DataFrame
+    rows = {symbol: positions for symbol, positions in df.groupby(df['symbol'].fillna('')).indices.items()}
+
+    return {
+        'symbols': sorted(symbol for symbol in views if symbol not in (ALL_SYMBOLS, '')),
+        'rows': rows,
+        'views': views,
+    }
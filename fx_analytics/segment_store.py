@@ -0,0 +1,473 @@
+"""
+Segmented deal store for frequent incremental ETL appends.
+
+A store is a directory with CSV segments and a 'manifest.json' listing every segment with its
+row count, min/max 'date' and symbol set. Every ETL append writes a new small segment, and
+`compact_store` merges runs of small segments into segments of about config.SEGMENT_ROWS rows,
+so the per-file overhead of a read does not grow with the number of appends. Range readers
+(`iter_store_chunks`, `read_store`) use the manifest statistics to skip segments outside the
+requested dates and symbols; the dashboard aggregates the whole store with `aggregate_store`,
+so it benefits from compaction and retention, not from this pruning.
+
+`apply_retention` moves raw deals older than config.RETENTION_MONTHS months to 'archive/' and
+folds them into a rollups file, which has the format of the bounded-memory aggregate (see
+`out_of_core`). The dashboard totals keep covering the full history while the raw window, and
+with it the read latency, stays bounded. `start_maintenance` runs both in a background thread.
+
+The manifest is the single source of truth: it lists the live segments and the current rollups
+file, and it is replaced atomically, so a reader never sees a partial set of segments or counts
+archived deals twice. Superseded files are deleted only once they have been obsolete for
+config.OBSOLETE_GRACE seconds, so readers of the previous manifest can finish. Appends and
+maintenance must run in the same process (e.g. the ETL process), readers can run anywhere.
+
+Segments written by different ETL versions may carry different columns (e.g. no 'time' or
+bucket columns), so segment and rollup aggregates are always indexed by every key in
+AGGREGATE_KEYS, missing ones as NaN. Segments are immutable, so `aggregate_store` keeps the
+aggregate of every segment by file name and only reads segments it has not seen yet.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+from loguru import logger
+from fx_analytics import config
+from fx_analytics.data_store import data_version
+from fx_analytics.out_of_core import AGGREGATE_KEYS, READ_COLUMNS, SUM_COLUMNS, aggregate_chunk, count_trades
+
+MANIFEST = 'manifest.json'
+# rollups file of stores written before the manifest named it
+ROLLUPS = 'rollups.csv'
+SEGMENTS = 'segments'
+ARCHIVE = 'archive'
+
+# one lock per store directory, serializing appends and maintenance
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+# aggregate and trade count of every live segment, by store directory and segment file name
+_segment_aggregates: Dict[str, Dict[str, Tuple[pd.DataFrame, int]]] = {}
+
+
+def _store_lock(store_dir: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(os.path.realpath(store_dir), threading.Lock())
+
+
+def read_manifest(store_dir: str) -> Dict:
+    """
+    Read the manifest of a store.
+
+    Args:
+        store_dir (str): Path to the store directory.
+
+    Returns:
+        Dict: 'segments' and 'archive' (lists of segment statistics), 'rollups' (the rollups file
+              of the archived deals, or None), 'obsolete' (superseded files with the time they
+              were superseded) and 'archived_trades' (trades whose raw deals were archived).
+    """
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.isfile(path):
+        return {'segments': [], 'archive': [], 'rollups': None, 'obsolete': [], 'archived_trades': 0}
+    with open(path) as handle:
+        manifest = json.load(handle)
+
+    if 'rollups' not in manifest:
+        manifest['rollups'] = ROLLUPS if os.path.isfile(os.path.join(store_dir, ROLLUPS)) else None
+    return manifest
+
+
+def _write_manifest(store_dir: str, manifest: Dict) -> None:
+    path = os.path.join(store_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as handle:
+        json.dump(manifest, handle, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def store_version(store_dir: str) -> str:
+    """
+    Return the data version of a store; it changes with every append, compaction or retention run.
+    """
+    return data_version(os.path.join(store_dir, MANIFEST))
+
+
+def _write_segment(store_dir: str, df: pd.DataFrame, directory: str = SEGMENTS) -> Dict:
+    """
+    Write deals to a new segment file and return its statistics.
+    """
+    name = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}.csv"
+    os.makedirs(os.path.join(store_dir, directory), exist_ok=True)
+    df.to_csv(os.path.join(store_dir, directory, name), index=False)
+
+    dates = df['date'].astype(str)
+    return {
+        'file': name,
+        'rows': len(df),
+        'min_date': dates.min(),
+        'max_date': dates.max(),
+        # deposits have no symbol, they are listed as ''
+        'symbols': sorted(df['symbol'].fillna('').astype(str).unique().tolist()),
+    }
+
+
+def _read_segment(store_dir: str, segment: Dict, directory: str = SEGMENTS, usecols=None) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(store_dir, directory, segment['file']), usecols=usecols)
+
+
+def _mark_obsolete(manifest: Dict, name: str, directory: str = SEGMENTS) -> None:
+    """
+    List a file that the manifest no longer refers to for deletion by a later run.
+    """
+    manifest['obsolete'].append({'file': name, 'directory': directory, 'since': time.time()})
+
+
+def _remove_obsolete(store_dir: str, manifest: Dict, grace: float) -> int:
+    """
+    Delete the superseded files that have been obsolete for at least `grace` seconds; files
+    superseded more recently may still be read through the previous manifest. Returns the
+    number of deleted entries.
+    """
+    now = time.time()
+    pending = []
+    for entry in manifest['obsolete']:
+        if now - entry['since'] < grace:
+            pending.append(entry)
+            continue
+        try:
+            os.remove(os.path.join(store_dir, entry['directory'], entry['file']))
+        except FileNotFoundError:
+            pass
+
+    removed = len(manifest['obsolete']) - len(pending)
+    manifest['obsolete'] = pending
+    return removed
+
+
+def append_deals(store_dir: str, df: pd.DataFrame) -> None:
+    """
+    Append deals to the store as a new segment.
+
+    Args:
+        store_dir (str): Path to the store directory; created if it does not exist.
+        df (pd.DataFrame): Deals as returned by the ETL, with 'date' and 'symbol' columns.
+
+    Example:
+        >>> append_deals('data/deals', ETL(from_date='2023-09-28', mt5_credentials=mt5_credentials))
+    """
+    if df.empty:
+        return
+
+    with _store_lock(store_dir):
+        os.makedirs(store_dir, exist_ok=True)
+        manifest = read_manifest(store_dir)
+        manifest['segments'].append(_write_segment(store_dir, df))
+        _write_manifest(store_dir, manifest)
+
+    logger.info("Appended {} deals to {}", len(df), store_dir)
+
+
+def _overlaps(segment: Dict, start: Optional[str], end: Optional[str], symbols: Optional[set]) -> bool:
+    """
+    Tell from the segment statistics whether a segment can hold deals in the requested range.
+    """
+    if start is not None and segment['max_date'] < start:
+        return False
+    if end is not None and segment['min_date'] > end:
+        return False
+    return symbols is None or not symbols.isdisjoint(segment['symbols'])
+
+
+def _iter_segments(store_dir: str, manifest: Dict, date_range: Optional[Tuple] = None,
+                   symbols: Optional[Iterable[str]] = None, columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    start, end = (None, None) if date_range is None else \
+        (None if value is None else pd.Timestamp(value).date().isoformat() for value in date_range)
+    symbols = None if symbols is None else set(symbols)
+
+    selected = [segment for segment in manifest['segments'] if _overlaps(segment, start, end, symbols)]
+    logger.info("Reading {} of {} segments from {}", len(selected), len(manifest['segments']), store_dir)
+
+    wanted = None if columns is None else set(columns) | {'date', 'symbol'}
+    usecols = None if wanted is None else (lambda column: column in wanted)
+
+    for segment in selected:
+        chunk = _read_segment(store_dir, segment, usecols=usecols)
+
+        # Segments on the edge of the range still hold deals outside of it
+        dates = chunk['date'].astype(str)
+        keep = np.ones(len(chunk), dtype=bool)
+        if start is not None and segment['min_date'] < start:
+            keep &= (dates >= start).to_numpy()
+        if end is not None and segment['max_date'] > end:
+            keep &= (dates <= end).to_numpy()
+        if symbols is not None:
+            keep &= chunk['symbol'].fillna('').isin(symbols).to_numpy()
+
+        yield chunk if keep.all() else chunk.loc[keep]
+
+
+def iter_store_chunks(store_dir: str, date_range: Optional[Tuple] = None, symbols: Optional[Iterable[str]] = None,
+                      columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the live (not archived) deals of a store segment by segment.
+
+    Segments whose min/max date or symbol set rule out the requested deals are not read.
+
+    Args:
+        store_dir (str): Path to the store directory.
+        date_range (Tuple, optional): Inclusive (start, end) dates; either end may be None.
+        symbols (Iterable[str], optional): Only these symbols; '' selects deposits.
+        columns (Iterable[str], optional): Read only these columns (missing ones are skipped).
+
+    Yields:
+        pd.DataFrame: The requested deals of the next segment.
+    """
+    yield from _iter_segments(store_dir, read_manifest(store_dir), date_range, symbols, columns)
+
+
+def read_store(store_dir: str, date_range: Optional[Tuple] = None, symbols: Optional[Iterable[str]] = None,
+               columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Read the live deals of a store into a DataFrame, see `iter_store_chunks`.
+
+    Example:
+        >>> read_store('data/deals', date_range=('2023-10-01', None), symbols=['EURUSD'])
+    """
+    chunks = list(iter_store_chunks(store_dir, date_range, symbols, columns))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def compact_store(store_dir: str, target_rows: int = config.SEGMENT_ROWS, grace: float = config.OBSOLETE_GRACE) -> int:
+    """
+    Merge runs of small segments into segments of about `target_rows` rows.
+
+    Segments are ordered by date, so merged segments cover contiguous date ranges and stay
+    selective for date pruning.
+
+    Args:
+        store_dir (str): Path to the store directory.
+        target_rows (int): Target number of rows per segment. Default is config.SEGMENT_ROWS.
+        grace (float): Seconds superseded files are kept before deletion. Default is config.OBSOLETE_GRACE.
+
+    Returns:
+        int: The number of segments that were merged.
+    """
+    with _store_lock(store_dir):
+        manifest = read_manifest(store_dir)
+        removed = _remove_obsolete(store_dir, manifest, grace)
+        segments = sorted(manifest['segments'], key=lambda segment: (segment['min_date'], segment['file']))
+
+        # Group consecutive small segments into runs of about target_rows rows
+        kept, runs, run = [], [], []
+        for segment in segments:
+            if segment['rows'] >= target_rows:
+                kept.append(segment)
+                continue
+            run.append(segment)
+            if sum(member['rows'] for member in run) >= target_rows:
+                runs.append(run)
+                run = []
+        runs.append(run)
+
+        merged = 0
+        for run in runs:
+            if len(run) < 2:
+                kept.extend(run)
+                continue
+            frame = pd.concat([_read_segment(store_dir, segment) for segment in run], ignore_index=True)
+            kept.append(_write_segment(store_dir, frame))
+            for segment in run:
+                _mark_obsolete(manifest, segment['file'])
+            merged += len(run)
+
+        # an unchanged manifest keeps the store version, so readers keep their caches
+        if merged or removed:
+            manifest['segments'] = sorted(kept, key=lambda segment: (segment['min_date'], segment['file']))
+            _write_manifest(store_dir, manifest)
+
+    if merged:
+        logger.info("Compacted {} segments of {} into {}", merged, store_dir, len(manifest['segments']))
+    return merged
+
+
+def _with_all_keys(aggregate: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index an aggregate by every key in AGGREGATE_KEYS, the keys it lacks as NaN.
+    """
+    aggregate = aggregate.reset_index()
+    for column in AGGREGATE_KEYS:
+        if column not in aggregate.columns:
+            aggregate[column] = np.nan
+    return aggregate.set_index(AGGREGATE_KEYS)[SUM_COLUMNS + ['deals']]
+
+
+def _merge(aggregates: Iterable[Optional[pd.DataFrame]]) -> Optional[pd.DataFrame]:
+    """
+    Add aggregates indexed by `_with_all_keys` into one, keeping rows with missing keys.
+    """
+    aggregates = [aggregate for aggregate in aggregates if aggregate is not None]
+    if not aggregates:
+        return None
+    return pd.concat(aggregates).groupby(level=AGGREGATE_KEYS, dropna=False).sum()
+
+
+def _aggregate_segment(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Return the aggregate (indexed by every key) and the trade count of a segment's deals.
+    """
+    chunk = chunk[[column for column in READ_COLUMNS if column in chunk.columns]]
+    return _with_all_keys(aggregate_chunk(chunk)), count_trades(chunk)
+
+
+def _read_rollups(store_dir: str, manifest: Dict) -> Optional[pd.DataFrame]:
+    """
+    Read the rollups of archived deals listed in the manifest, indexed by every key.
+    """
+    if manifest['rollups'] is None:
+        return None
+    rollups = pd.read_csv(os.path.join(store_dir, manifest['rollups']))
+    # deposits are aggregated under the symbol ''
+    rollups['symbol'] = rollups['symbol'].fillna('')
+    return _with_all_keys(rollups)
+
+
+def apply_retention(store_dir: str, months: Optional[int] = config.RETENTION_MONTHS, today: Optional[date] = None,
+                    grace: float = config.OBSOLETE_GRACE) -> int:
+    """
+    Archive raw deals older than `months` months and keep their rollups.
+
+    Archived deals are moved to 'archive/' (with their statistics in the manifest) and added to
+    a new rollups file; segments straddling the cutoff are split. The new segments and rollups
+    replace the old ones with a single manifest write.
+
+    Args:
+        store_dir (str): Path to the store directory.
+        months (int, optional): Months of raw deals to keep live; None disables retention.
+                                Default is config.RETENTION_MONTHS.
+        today (date, optional): Reference date of the cutoff. Default is today.
+        grace (float): Seconds superseded files are kept before deletion. Default is config.OBSOLETE_GRACE.
+
+    Returns:
+        int: The number of archived deals.
+    """
+    if not months:
+        return 0
+
+    cutoff = (pd.Timestamp(today or date.today()) - pd.DateOffset(months=months)).date().isoformat()
+
+    with _store_lock(store_dir):
+        manifest = read_manifest(store_dir)
+        expired = [segment for segment in manifest['segments'] if segment['min_date'] < cutoff]
+        if not expired:
+            return 0
+
+        _remove_obsolete(store_dir, manifest, grace)
+        live = [segment for segment in manifest['segments'] if segment['min_date'] >= cutoff]
+        rollups = _read_rollups(store_dir, manifest)
+        trades = 0
+        archived = 0
+
+        for segment in expired:
+            frame = _read_segment(store_dir, segment)
+            old = (frame['date'].astype(str) < cutoff).to_numpy()
+            if not old.all():
+                live.append(_write_segment(store_dir, frame.loc[~old]))
+
+            deals = frame.loc[old]
+            manifest['archive'].append(_write_segment(store_dir, deals, ARCHIVE))
+            aggregate, count = _aggregate_segment(deals)
+            rollups = _merge([rollups, aggregate])
+            trades += count
+            _mark_obsolete(manifest, segment['file'])
+            archived += len(deals)
+
+        # the rollups are only switched by the manifest write below, together with the segments
+        name = f"rollups-{time.time_ns()}.csv"
+        rollups.reset_index().to_csv(os.path.join(store_dir, name), index=False)
+        if manifest['rollups'] is not None:
+            _mark_obsolete(manifest, manifest['rollups'], '')
+        manifest['rollups'] = name
+
+        manifest['segments'] = sorted(live, key=lambda segment: (segment['min_date'], segment['file']))
+        manifest['archived_trades'] += trades
+        _write_manifest(store_dir, manifest)
+
+    logger.info("Archived {} deals before {} from {}", archived, cutoff, store_dir)
+    return archived
+
+
+def aggregate_store(store_dir: str) -> Tuple[pd.DataFrame, int]:
+    """
+    Aggregate a store like `out_of_core.aggregate_deals`: the rollups of archived deals merged
+    with the aggregate of every live segment. Rollups and segments are taken from one manifest,
+    so archived deals are counted exactly once. Only segments not aggregated by a previous call
+    are read, one at a time.
+
+    Args:
+        store_dir (str): Path to the store directory.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: The aggregate and the number of unique trades.
+
+    Raises:
+        ValueError: If the store holds no deals.
+    """
+    manifest = read_manifest(store_dir)
+    cached = _segment_aggregates.get(os.path.realpath(store_dir), {})
+    segments = {}
+
+    for segment in manifest['segments']:
+        segments[segment['file']] = cached.get(segment['file']) or \
+            _aggregate_segment(_read_segment(store_dir, segment, usecols=lambda column: column in READ_COLUMNS))
+
+    # segments merged or archived since the last call are dropped from the cache
+    _segment_aggregates[os.path.realpath(store_dir)] = segments
+    logger.info("Aggregated {} segments from {}, {} read", len(segments), store_dir, len(segments.keys() - cached.keys()))
+
+    aggregate = _merge([_read_rollups(store_dir, manifest)] + [aggregate for aggregate, _ in segments.values()])
+    if aggregate is None:
+        raise ValueError(f"No deals found in {store_dir}")
+
+    trades = manifest['archived_trades'] + sum(count for _, count in segments.values())
+
+    # keys that no segment or rollup carries are left out, like in `aggregate_deals`
+    aggregate = aggregate.reset_index()
+    missing = [column for column in AGGREGATE_KEYS if aggregate[column].isna().all()]
+    return aggregate.drop(columns=missing), trades
+
+
+def start_maintenance(store_dir: str,
+                      interval: float = config.MAINTENANCE_INTERVAL,
+                      target_rows: int = config.SEGMENT_ROWS,
+                      months: Optional[int] = config.RETENTION_MONTHS) -> threading.Event:
+    """
+    Run `compact_store` and `apply_retention` every `interval` seconds in a daemon thread.
+
+    Args:
+        store_dir (str): Path to the store directory.
+        interval (float): Seconds between runs. Default is config.MAINTENANCE_INTERVAL.
+        target_rows (int): Target number of rows per segment. Default is config.SEGMENT_ROWS.
+        months (int, optional): Months of raw deals to keep live. Default is config.RETENTION_MONTHS.
+
+    Returns:
+        threading.Event: Set it to stop the maintenance thread.
+    """
+    stop = threading.Event()
+
+    def run():
+        while True:
+            try:
+                apply_retention(store_dir, months)
+                compact_store(store_dir, target_rows)
+            except Exception:
+                logger.exception("Maintenance of {} failed", store_dir)
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=run, name='deal-store-maintenance', daemon=True).start()
+    return stop
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from loguru import logger
+from fx_analytics import mt5_simulator
+from fx_analytics.currency import convert_to_reporting_currency, load_rate_table, needs_conversion, save_rate_table
+from fx_analytics.main_functions import extract_rates_mt5
+
+RATES = pd.DataFrame({
+    'date': pd.to_datetime(['2023-09-01', '2023-09-01', '2023-09-04', '2023-09-04']),
+    'currency': ['USD', 'GBP', 'USD', 'GBP'],
+    'rate': [0.90, 1.15, 0.95, 1.20],
+})
+
+# Define a test function for the as-of join of deals against the rate table
+def test_convert_uses_latest_rate_on_or_before_date():
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2023-08-31', '2023-09-02', '2023-09-04', '2023-09-05']).date,
+        'type': [2, 0, 1, 1],
+        'profit': [1000.0, 0.0, 10.0, 20.0],
+        'commission': [0.0, -1.0, -1.0, 0.0],
+        'swap': 0.0,
+        'fee': 0.0,
+    })
+
+    warnings = []
+    sink = logger.add(warnings.append, level='WARNING')
+    try:
+        usd = convert_to_reporting_currency(df, RATES, 'USD', account_currency='EUR')
+    finally:
+        logger.remove(sink)
+
+    # EUR -> USD is 1 / rate(USD); before the first rate the first rate applies, with a warning
+    np.testing.assert_allclose(usd['fx_rate'], [1 / 0.90, 1 / 0.90, 1 / 0.95, 1 / 0.95])
+    np.testing.assert_allclose(usd['profit'], df['profit'] * usd['fx_rate'])
+    assert len(warnings) == 1 and '2023-08-31' in warnings[0]
+    # the input is left untouched
+    assert df['profit'].tolist() == [1000.0, 0.0, 10.0, 20.0]
+
+# Define a test function for consolidated accounts in several currencies
+def test_convert_mixed_account_currencies():
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2023-09-04', '2023-09-04']).date,
+        'currency': ['GBP', 'EUR'],
+        'profit': [10.0, 10.0], 'commission': 0.0, 'swap': 0.0, 'fee': 0.0,
+    })
+
+    assert needs_conversion(df, 'EUR')
+    eur = convert_to_reporting_currency(df, RATES, 'EUR')
+    np.testing.assert_allclose(eur['profit'], [12.0, 10.0])
+
+    with pytest.raises(ValueError):
+        convert_to_reporting_currency(df, RATES, 'JPY')
+
+# Define a test function for building the rate table from MT5 daily bars
+def test_extract_rates_against_simulator(tmp_path):
+    mt5_simulator.configure(seed=1)
+    try:
+        rates = extract_rates_mt5(['EUR', 'USD'], '2023-09-01', {'login': 0, 'server': 'simulator', 'password': ''})
+    finally:
+        mt5_simulator.reset()
+
+    assert set(rates['currency']) == {'USD'}
+    assert (rates['rate'] > 0).all()
+
+    path = str(tmp_path / 'rates.csv')
+    save_rate_table(rates, path)
+    save_rate_table(rates, path)
+    assert len(load_rate_table(path)) == len(rates)
@@ -0,0 +1,41 @@
+import os
+import pandas as pd
+from fx_analytics.deal_explorer import build_deal_index, query_deals
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+df = pd.read_csv(os.path.join(script_dir, 'fx_history.csv'))
+
+# Define a test function comparing the explorer with plain pandas filtering
+def test_query_deals_matches_pandas():
+    index = build_deal_index(df)
+    page_df, total = query_deals(index, symbols=['XAUUSD'], types=[0, 1],
+                                 date_range=('2023-10-02', '2023-10-06'),
+                                 sort_by='profit', ascending=False, page=1, page_size=10)
+
+    expected = df.loc[(df['symbol'] == 'XAUUSD') & df['type'].isin([0, 1])
+                      & df['date'].between('2023-10-02', '2023-10-06')]
+    expected = expected.sort_values('profit', ascending=False)
+
+    assert total == len(expected)
+    assert len(page_df) == 10
+    assert page_df['profit'].tolist() == expected['profit'].iloc[10:20].tolist()
+
+# Define a test function for the position filter
+def test_query_deals_position():
+    index = build_deal_index(df)
+    position_id = df.loc[df['type'] == 0, 'position_id'].iloc[0]
+    page_df, total = query_deals(index, position_id=position_id)
+    assert total == (df['position_id'] == position_id).sum()
+    assert (page_df['position_id'] == position_id).all()
+
+# Define a test function for missing values, which sort last in both directions
+def test_query_deals_missing_values_last():
+    frame = pd.DataFrame({'date': '2023-10-02', 'type': 0, 'symbol': 'XAUUSD', 'position_id': range(5),
+                          'profit': [1.0, None, 3.0, 3.0, -2.0]})
+    index = build_deal_index(frame)
+
+    descending, _ = query_deals(index, sort_by='profit', ascending=False)
+    ascending, _ = query_deals(index, sort_by='profit', ascending=True)
+
+    assert descending['position_id'].tolist() == [2, 3, 0, 4, 1]
+    assert ascending['position_id'].tolist() == [4, 0, 2, 3, 1]
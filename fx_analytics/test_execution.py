@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fx_analytics import mt5_simulator
+from fx_analytics.execution import execution_quality, link_deals_to_orders
+from fx_analytics.main_functions import ETL
+
+# Define a test function for the indexed deal-to-order join
+def test_link_by_ticket_and_position():
+    orders = pd.DataFrame({
+        'ticket': [30, 10, 20],
+        'position_id': [2, 1, 1],
+        'time_setup_msc': [3_000, 1_000, 2_000],
+        'price_open': [1.3, 1.1, 1.2],
+    })
+    deals = pd.DataFrame({
+        'order': [20, 0, 10, 99, 0, 0],
+        'position_id': [1, 2, 1, 3, 0, 2],
+        'entry': [1, 0, 0, 0, 0, 1],
+    })
+
+    linked = link_deals_to_orders(deals, orders)
+
+    # by ticket, by the first order of the position (opening deals only), and unmatched
+    # (unknown position, balance deal, closing deal without its order)
+    np.testing.assert_array_equal(linked['order_price'], [1.2, 1.3, 1.1, np.nan, np.nan, np.nan])
+    np.testing.assert_array_equal(linked['order_time_msc'], [2_000, 3_000, 1_000, np.nan, np.nan, np.nan])
+    assert 'order_price' not in deals.columns
+    assert link_deals_to_orders(None, orders) is None
+
+# Define a test function for the slippage sign and the distributions
+def test_execution_quality():
+    df = pd.DataFrame({
+        'type': [2, 0, 1, 0],
+        'symbol': [None, 'EURUSD', 'EURUSD', 'XAUUSD'],
+        'price': [0.0, 1.1001, 1.0999, 1900.0],
+        'order_price': [np.nan, 1.1, 1.1, 1900.5],
+        'time_msc': [0, 3_600_000 + 150, 3_600_000 + 250, 7_200_000 + 50],
+        'order_time_msc': [np.nan, 3_600_000, 3_600_000, 7_200_000],
+    })
+
+    quality = execution_quality(df)
+
+    # buys filled higher and sells filled lower are both adverse
+    assert quality['fills']['slippage'].tolist() == pytest.approx([0.0001, 0.0001, -0.5])
+    assert quality['fills']['latency_ms'].tolist() == [150, 250, 50]
+    assert quality['by_symbol'].loc['EURUSD', 'fills'] == 2
+    assert quality['by_symbol'].loc['EURUSD', 'latency_ms_p50'] == 200
+    assert list(quality['by_hour'].index) == [1, 2]
+
+# Define a test function for the ETL linking orders from the simulator, in a single session
+def test_etl_links_orders(monkeypatch):
+    sessions = []
+    initialize = mt5_simulator.initialize
+    monkeypatch.setattr(mt5_simulator, 'initialize', lambda: sessions.append(1) or initialize())
+
+    mt5_simulator.configure(deals=201, seed=3)
+    try:
+        df = ETL('2023-09-01', {'login': 0, 'server': 'simulator', 'password': ''})
+    finally:
+        mt5_simulator.reset()
+
+    assert len(sessions) == 1
+
+    trades = df.loc[df['type'] != 2]
+    assert trades['order_price'].notna().all()
+
+    quality = execution_quality(df)
+    assert len(quality['fills']) == len(trades)
+    assert (quality['fills']['latency_ms'] > 0).all()
+    assert quality['by_symbol']['fills'].sum() == len(trades)
+
+# Define a test function for the ETL when the orders cannot be extracted
+def test_etl_without_orders(monkeypatch):
+    monkeypatch.setattr(mt5_simulator, 'history_orders_get', lambda *args, **kwargs: None)
+
+    mt5_simulator.configure(deals=201, seed=3)
+    try:
+        df = ETL('2023-09-01', {'login': 0, 'server': 'simulator', 'password': ''})
+    finally:
+        mt5_simulator.reset()
+
+    assert len(df) == 201
+    assert execution_quality(df)['fills'] is None
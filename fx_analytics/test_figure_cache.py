@@ -0,0 +1,41 @@
+import json
+import os
+import plotly.express as px
+from fx_analytics.figure_cache import cached_spec, figure_from_spec, figure_key
+
+def build_counter():
+    calls = []
+    def build():
+        calls.append(1)
+        return px.bar(x=['a', 'b'], y=[1, len(calls)])
+    return build, calls
+
+# Define a test function for figure specs served from the disk tier
+def test_figure_built_once(tmp_path):
+    build, calls = build_counter()
+    first = cached_spec(build, str(tmp_path), version='1-1', symbol='EURUSD', chart='growth')
+    second = cached_spec(build, str(tmp_path), version='1-1', symbol='EURUSD', chart='growth')
+
+    assert len(calls) == 1
+    assert second == first
+    # the spec renders back into the figure it was built from
+    assert json.loads(figure_from_spec(second).to_json()) == json.loads(build_counter()[0]().to_json())
+
+    # a new data version is a new figure
+    cached_spec(build, str(tmp_path), version='1-2', symbol='EURUSD', chart='growth')
+    assert len(calls) == 2
+    assert figure_key(version='1-1', chart='growth') == figure_key(chart='growth', version='1-1')
+
+# Define a test function for LRU eviction of the disk tier
+def test_least_recently_used_evicted(tmp_path):
+    build, calls = build_counter()
+    for version in range(5):
+        cached_spec(build, str(tmp_path), max_files=3, version=version)
+        os.utime(tmp_path / f"{figure_key(version=version)}.json", ns=(version, version))
+
+    # reading version 2 makes it the most recently used
+    cached_spec(build, str(tmp_path), max_files=3, version=2)
+    cached_spec(build, str(tmp_path), max_files=3, version=5)
+
+    cached = sorted(path.name for path in tmp_path.iterdir())
+    assert cached == sorted(f"{figure_key(version=version)}.json" for version in (2, 4, 5))
@@ -0,0 +1,79 @@
+import os
+import json
+import threading
+import urllib.error
+import urllib.request
+import pandas as pd
+import pytest
+from fx_analytics.metrics_api import (current_metrics, etag_matches, make_metrics_server, open_metrics_state,
+                                      serialize_metrics)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+df = pd.read_csv(os.path.join(script_dir, 'fx_history.csv'))
+
+# Start the metrics server on a free port
+@pytest.fixture
+def server(tmp_path):
+    path = tmp_path / 'deals.csv'
+    df.to_csv(path, index=False)
+    server = make_metrics_server(str(path), port=0, refresh_interval=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, path
+    server.shutdown()
+    server.server_close()
+
+def get(server, etag=None):
+    request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+    if etag:
+        request.add_header('If-None-Match', etag)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers['ETag'], response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers['ETag'], b''
+
+# Define a test function for the metrics and ETag revalidation
+def test_metrics_etag(server):
+    server, path = server
+
+    status, etag, body = get(server)
+    metrics = json.loads(body)
+    assert status == 200
+    assert metrics['deposit'] == df.loc[df['type'] == 2, 'profit'].sum()
+    assert metrics['total_trades'] == df.loc[df['type'] == 0, 'position_id'].nunique()
+
+    # Unchanged data: 304 without body
+    assert get(server, etag)[0] == 304
+
+    # Appended deals change the ETag
+    df.iloc[:5].to_csv(path, mode='a', header=False, index=False)
+    status, new_etag, _ = get(server, etag)
+    assert status == 200
+    assert new_etag != etag
+
+# Define a test function for the refresh interval: the deal file is not checked again before it elapses
+def test_metrics_refresh_interval(tmp_path):
+    path = tmp_path / 'deals.csv'
+    df.to_csv(path, index=False)
+    state = open_metrics_state(str(path), refresh_interval=3600)
+    version = current_metrics(state)['version']
+
+    df.iloc[:5].to_csv(path, mode='a', header=False, index=False)
+    assert current_metrics(state)['version'] == version
+
+    state['refresh_interval'] = 0
+    assert current_metrics(state)['version'] != version
+
+# Define a test function for If-None-Match lists and wildcards
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches('*', '"b"')
+    assert not etag_matches('"ab"', '"b"')
+    assert not etag_matches('', '"b"')
+
+# Define a test function for non-finite numbers, which JSON cannot hold
+def test_serialize_metrics_strict_json():
+    body = serialize_metrics({'portfolio_value': float('nan'), 'weekly_growth_pct': [float('inf'), 1.5]})
+    assert json.loads(body) == {'portfolio_value': None, 'weekly_growth_pct': [None, 1.5]}
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fx_analytics.monte_carlo import daily_returns, simulate_equity_paths, simulation_summary, trade_returns
+
+# Define a test function for a deterministic return series
+def test_constant_returns():
+    result = simulate_equity_paths(np.array([0.01]), start_balance=1000, n_paths=50, horizon=10, workers=1)
+    assert result['terminal'] == pytest.approx(np.full(50, 1000 * 1.01 ** 10))
+    assert (result['max_drawdown'] == 0).all()
+
+# Define a test function for seeded results across worker counts
+def test_seeded_results_independent_of_workers():
+    returns = np.random.default_rng(0).normal(0.001, 0.01, 100)
+    serial = simulate_equity_paths(returns, 1000, n_paths=5_000, seed=7, workers=1, batch_size=1_000)
+    parallel = simulate_equity_paths(returns, 1000, n_paths=5_000, seed=7, workers=2, batch_size=1_000)
+
+    np.testing.assert_array_equal(serial['terminal'], parallel['terminal'])
+    assert len(serial['terminal']) == 5_000
+    assert ((serial['max_drawdown'] >= 0) & (serial['max_drawdown'] < 1)).all()
+
+    summary = simulation_summary(serial)
+    assert summary['terminal_balance'].is_monotonic_increasing
+
+# Define a test function for trading without a deposit, which has no balance to relate returns to
+def test_returns_without_deposit():
+    df = pd.DataFrame({'date': ['2023-10-02', '2023-10-03', '2023-10-04'], 'type': 0, 'position_id': [1, 2, 3],
+                       'profit': [10.0, 5.0, -3.0], 'swap': 0.0, 'commission': 0.0, 'fee': 0.0})
+
+    np.testing.assert_allclose(daily_returns(df), [5 / 10, -3 / 15])
+    np.testing.assert_allclose(trade_returns(df), [5 / 10, -3 / 15])
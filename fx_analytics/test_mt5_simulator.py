@@ -0,0 +1,55 @@
+import pytest
+from fx_analytics import mt5_simulator
+from fx_analytics.etl_benchmark import benchmark_etl
+from fx_analytics.main_functions import ETL
+
+CREDENTIALS = {'login': 0, 'server': 'simulator', 'password': ''}
+
+# Reset the simulator after every test
+@pytest.fixture(autouse=True)
+def simulator():
+    yield mt5_simulator
+    mt5_simulator.reset()
+
+# Define a test function for the ETL running against the simulator
+def test_etl_against_simulator():
+    mt5_simulator.configure(deals=501, seed=1)
+    df = ETL('2023-09-01', CREDENTIALS)
+
+    # All deals are returned, with a date column and a single deposit
+    assert len(df) == 501
+    assert 'date' in df.columns
+    assert (df['type'] == 2).sum() == 1
+    # Every position is opened and closed
+    trades = df.loc[df['type'] != 2]
+    assert (trades.groupby('position_id').size() == 2).all()
+
+# Define a test function for simulated failures
+def test_simulated_login_failure():
+    mt5_simulator.configure(failure_rate=1.0)
+    with pytest.raises(RuntimeError):
+        ETL('2023-09-01', CREDENTIALS)
+    assert mt5_simulator.last_error()[0] < 0
+
+# Define a test function for the benchmark harness
+def test_benchmark_etl():
+    result = benchmark_etl(sizes=[100], repeats=1)
+    assert result.loc[0, 'failures'] == 0
+    assert result.loc[0, 'deals_per_sec'] > 0
+
+# Define a test function for errors that were not injected by the simulator
+def test_benchmark_raises_real_errors(monkeypatch):
+    import fx_analytics.main_functions as main_functions
+
+    def broken(df):
+        raise AttributeError("bug")
+
+    monkeypatch.setattr(main_functions, 'data_transformation', broken)
+    with pytest.raises(AttributeError):
+        benchmark_etl(sizes=[100], repeats=1)
+
+    # injected failures are counted, not raised
+    monkeypatch.undo()
+    result = benchmark_etl(sizes=[100], repeats=5, failure_rate=0.5)
+    assert 0 < result.loc[0, 'failures'] <= 5
+    assert result.loc[0, 'peak_mb'] > 0
@@ -0,0 +1,50 @@
+import os
+import pandas as pd
+import pytest
+from fx_analytics.out_of_core import aggregate_deals
+from fx_analytics.app import (get_portfolio_growth, weekly_percentage_growth, monthly_percentage_growth,
+                              plot_piechart, daily_commodities_trade_pie_chart, create_symbol_count_dataframe,
+                              total_trades)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+csv_file_path = os.path.join(script_dir, 'fx_history.csv')
+df = pd.read_csv(csv_file_path)
+
+# Define a test function comparing the chunked aggregate with the in-memory path
+@pytest.mark.parametrize('chunksize', [50, 10_000])
+def test_aggregate_matches_in_memory(chunksize):
+    aggregate, trades = aggregate_deals(csv_file_path, chunksize=chunksize)
+
+    assert trades == total_trades(df)
+    for profit in (True, False):
+        pd.testing.assert_frame_equal(get_portfolio_growth(aggregate, profit=profit).reset_index(drop=True),
+                                      get_portfolio_growth(df, profit=profit).reset_index(drop=True))
+    for growth_function in (weekly_percentage_growth, monthly_percentage_growth):
+        pd.testing.assert_frame_equal(growth_function(aggregate).reset_index(drop=True),
+                                      growth_function(df).reset_index(drop=True))
+
+    # Pie charts count deals
+    pie_slices = lambda fig: dict(zip(fig.data[0].labels, fig.data[0].values))
+    assert pie_slices(plot_piechart(aggregate)) == pie_slices(plot_piechart(df))
+    assert pie_slices(daily_commodities_trade_pie_chart(aggregate, create_symbol_count_dataframe)) == \
+        pie_slices(daily_commodities_trade_pie_chart(df, create_symbol_count_dataframe))
+
+# Define a test function keeping deals with a missing currency in the aggregate
+def test_aggregate_keeps_missing_currency(tmp_path):
+    mixed = df.assign(currency=['USD' if i % 3 else None for i in range(len(df))])
+    mixed.to_csv(tmp_path / 'mixed.csv', index=False)
+
+    aggregate, _ = aggregate_deals(str(tmp_path / 'mixed.csv'), chunksize=50)
+
+    assert aggregate['deals'].sum() == len(df)
+    assert aggregate['profit'].sum() == pytest.approx(df['profit'].sum())
+
+# Define a test function for the trade count, with an open short and a position opened before the history
+def test_trade_count_matches_in_memory(tmp_path):
+    deals = pd.DataFrame({'date': '2023-10-02', 'type': [1, 0, 0, 1], 'entry': [0, 0, 1, 0],
+                          'symbol': 'EURUSD', 'position_id': [1, 2, 3, 4],
+                          'profit': 1.0, 'swap': 0.0, 'commission': 0.0, 'fee': 0.0})
+    deals.to_csv(tmp_path / 'deals.csv', index=False)
+
+    _, trades = aggregate_deals(str(tmp_path / 'deals.csv'), chunksize=1)
+    assert trades == total_trades(deals) == 3
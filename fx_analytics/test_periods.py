@@ -0,0 +1,33 @@
+import os
+import pandas as pd
+import pytest
+from fx_analytics.periods import FREQUENCIES, period_growth
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+df = pd.read_csv(os.path.join(script_dir, 'fx_history.csv'))
+
+# pandas period aliases of the engine frequencies
+PANDAS_PERIODS = {'daily': 'D', 'weekly': 'W-SUN', 'monthly': 'M', 'quarterly': 'Q', 'yearly': 'Y'}
+
+# Define a test function comparing the engine with pandas period grouping
+@pytest.mark.parametrize('frequency', FREQUENCIES)
+def test_period_growth_matches_pandas(frequency):
+    table = period_growth(df)[frequency]
+
+    trades = df.loc[df['type'] != 2]
+    total_profit = trades['profit'] + trades['swap'] + trades['commission'] + trades['fee']
+    periods = pd.to_datetime(trades['date']).dt.to_period(PANDAS_PERIODS[frequency])
+    expected = total_profit.groupby(periods).sum()
+
+    assert table['total_profit'].tolist() == pytest.approx(expected.tolist())
+    assert table['start'].tolist() == [period.start_time for period in expected.index]
+
+    # The closing balance of the last period is deposit plus all profit
+    deposit = df.loc[df['type'] == 2, 'profit'].sum()
+    assert table['balance'].iloc[-1] == pytest.approx(deposit + total_profit.sum())
+
+# Define a test function for the percentage growth of a period
+def test_growth_relative_to_opening_balance():
+    table = period_growth(df, ['weekly'])['weekly']
+    opening_balance = table['balance'].iloc[-2]
+    assert table['growth_%'].iloc[-1] == pytest.approx(round(table['total_profit'].iloc[-1] / opening_balance, 3) * 100)
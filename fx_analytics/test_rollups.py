@@ -0,0 +1,43 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from fx_analytics.rollups import ALL_SYMBOLS, build_symbol_rollups
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+df = pd.read_csv(os.path.join(script_dir, 'fx_history.csv'))
+
+# Define a test function for the rollup over all symbols
+def test_all_symbols_view_matches_balance():
+    view = build_symbol_rollups(df)['views'][ALL_SYMBOLS]
+
+    trades = df.loc[df['type'] != 2]
+    total_profit = (trades['profit'] + trades['swap'] + trades['commission'] + trades['fee']).sum()
+    deposit = df.loc[df['type'] == 2, 'profit'].sum()
+
+    # Latest date first, ending at deposit plus all profit
+    assert view['growth']['date'].is_monotonic_decreasing
+    assert view['growth']['growth'].iloc[0] == pytest.approx(deposit + total_profit)
+    assert view['periods']['weekly']['total_profit'].sum() == pytest.approx(total_profit)
+    assert view['trades']['count'].sum() == (df['type'] == 0).sum()
+
+# Define a test function for a single symbol
+def test_symbol_view_and_rows():
+    rollups = build_symbol_rollups(df)
+    symbol_df = df.take(rollups['rows']['XAUUSD'])
+    view = rollups['views']['XAUUSD']
+
+    assert (symbol_df['symbol'] == 'XAUUSD').all()
+    assert len(symbol_df) == (df['symbol'] == 'XAUUSD').sum()
+    expected = (symbol_df['profit'] + symbol_df['swap'] + symbol_df['commission'] + symbol_df['fee']).sum()
+    assert view['periods']['monthly']['total_profit'].sum() == pytest.approx(expected)
+
+# Define a test function for the growth of a symbol, relative to the account balance
+def test_symbol_growth_relative_to_account():
+    views = build_symbol_rollups(df)['views']
+    account = views[ALL_SYMBOLS]['periods']['monthly']
+    symbol = views['XAUUSD']['periods']['monthly'].merge(account, on='period', suffixes=('', '_account'))
+
+    opening_balance = symbol['balance_account'] - symbol['total_profit_account']
+    assert np.isfinite(symbol['growth_%']).all()
+    assert symbol['growth_%'].to_numpy() == pytest.approx((symbol['total_profit'] / opening_balance).round(3) * 100)
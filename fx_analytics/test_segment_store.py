@@ -0,0 +1,116 @@
+import os
+from datetime import date
+import numpy as np
+import pandas as pd
+from fx_analytics.out_of_core import aggregate_deals
+from fx_analytics.segment_store import (aggregate_store, append_deals, apply_retention, compact_store,
+                                        read_manifest, read_store)
+from fx_analytics.app import get_portfolio_growth, weekly_percentage_growth
+from fx_analytics.time_analytics import time_pnl_tables
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+csv_file_path = os.path.join(script_dir, 'fx_history.csv')
+df = pd.read_csv(csv_file_path)
+
+def make_store(path, appends=20):
+    for chunk in np.array_split(np.arange(len(df)), appends):
+        append_deals(str(path), df.iloc[chunk])
+    return str(path)
+
+# Define a test function for compaction of small appended segments
+def test_compaction_keeps_deals(tmp_path):
+    store = make_store(tmp_path)
+    assert len(read_manifest(store)['segments']) == 20
+
+    merged = compact_store(store, target_rows=250)
+    segments = read_manifest(store)['segments']
+    assert merged == 20 and len(segments) == 3
+    assert sum(segment['rows'] for segment in segments) == len(df)
+    # segments are ordered by date, deals within a segment keep their order
+    pd.testing.assert_frame_equal(read_store(store).sort_values('ticket', ignore_index=True),
+                                  df.sort_values('ticket', ignore_index=True), check_dtype=False)
+
+    # superseded files outlive the run that replaced them, for readers of the previous manifest
+    compact_store(store, target_rows=250)
+    assert len(os.listdir(os.path.join(store, 'segments'))) == 23
+    compact_store(store, target_rows=250, grace=0)
+    assert len(os.listdir(os.path.join(store, 'segments'))) == 3
+
+# Define a test function for pruning segments by their statistics
+def test_readers_skip_segments(tmp_path):
+    store = make_store(tmp_path)
+    latest = df['date'].max()
+    symbol = df.loc[df['date'] == latest, 'symbol'].dropna().iloc[0]
+
+    # segments before the range are never opened
+    for segment in read_manifest(store)['segments']:
+        if segment['max_date'] < latest:
+            os.remove(os.path.join(store, 'segments', segment['file']))
+
+    recent = read_store(store, date_range=(latest, None), symbols=[symbol])
+    expected = df.loc[(df['date'] == latest) & (df['symbol'] == symbol)]
+    assert len(recent) == len(expected) > 0
+
+# Define a test function for retention keeping the dashboard totals
+def test_retention_keeps_rollups(tmp_path):
+    store = make_store(tmp_path)
+    archived = apply_retention(store, months=1, today=date(2023, 10, 31))
+
+    assert archived == (df['date'] < '2023-09-30').sum() > 0
+    assert read_store(store)['date'].min() >= '2023-09-30'
+
+    aggregate, trades = aggregate_store(store)
+    expected, expected_trades = aggregate_deals(csv_file_path)
+    assert trades == expected_trades
+    for function in (get_portfolio_growth, weekly_percentage_growth):
+        pd.testing.assert_frame_equal(function(aggregate).reset_index(drop=True),
+                                      function(expected).reset_index(drop=True))
+
+# Define a test function for retention followed by compaction, as run by the maintenance thread
+def test_retention_then_compaction_keeps_store_readable(tmp_path):
+    store = make_store(tmp_path)
+    assert apply_retention(store, months=1, today=date(2023, 10, 25)) > 0
+    manifest = read_manifest(store)
+    compact_store(store, target_rows=250)
+
+    # the files of the previous manifest are still there
+    for segment in manifest['segments']:
+        assert os.path.isfile(os.path.join(store, 'segments', segment['file']))
+    for entry in read_manifest(store)['obsolete']:
+        assert os.path.isfile(os.path.join(store, entry['directory'], entry['file']))
+
+    # a second retention run replaces the rollups through the manifest: nothing counted twice
+    assert apply_retention(store, months=1, today=date(2023, 10, 31), grace=0) > 0
+    aggregate, trades = aggregate_store(store)
+    assert aggregate['deals'].sum() == len(df)
+    assert trades == aggregate_deals(csv_file_path)[1]
+    assert {'file': manifest['rollups'], 'directory': ''}.items() <= read_manifest(store)['obsolete'][-1].items()
+
+# Define a test function for a store mixing segments without time buckets and newer segments
+def test_mixed_segment_formats(tmp_path):
+    store = str(tmp_path)
+    old = df['date'] < '2023-09-30'
+    append_deals(store, df.loc[old].drop(columns=['time']))
+    append_deals(store, df.loc[~old])
+
+    aggregate, trades = aggregate_store(store)
+    assert aggregate['deals'].sum() == len(df)
+    assert trades == aggregate_deals(csv_file_path)[1]
+    assert aggregate.loc[aggregate['date'] >= '2023-09-30', 'hour'].notna().all()
+    tables = time_pnl_tables(aggregate)
+    assert tables['hour_weekday'].to_numpy().sum() != 0
+
+    # segments are aggregated once: the cached aggregate outlives the file
+    for segment in read_manifest(store)['segments']:
+        os.remove(os.path.join(store, 'segments', segment['file']))
+    pd.testing.assert_frame_equal(aggregate_store(store)[0], aggregate)
+
+    # retention folds the old segment into the rollups next to newer ones
+    store = str(tmp_path / 'retention')
+    append_deals(store, df.loc[old].drop(columns=['time']))
+    append_deals(store, df.loc[~old])
+    assert apply_retention(store, months=1, today=date(2023, 10, 31)) == old.sum()
+    append_deals(store, df.loc[old].drop(columns=['time']))
+    assert apply_retention(store, months=1, today=date(2023, 10, 31)) == old.sum()
+    aggregate, _ = aggregate_store(store)
+    assert aggregate['deals'].sum() == len(df) + old.sum()
@@ -0,0 +1,28 @@
+import os
+import pandas as pd
+import pytest
+from fx_analytics.time_analytics import add_time_buckets, time_pnl_tables
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+df = pd.read_csv(os.path.join(script_dir, 'fx_history.csv'))
+
+# Define a test function comparing the vectorized tables with a plain pandas pivot
+def test_time_pnl_tables_match_pivot():
+    bucketed = add_time_buckets(df)
+    tables = time_pnl_tables(bucketed)
+
+    trades = bucketed.loc[bucketed['type'] != 2].copy()
+    trades['pnl'] = trades['profit'] + trades['swap'] + trades['commission'] + trades['fee']
+    timestamps = pd.to_datetime(trades['time'])
+    expected = trades.groupby([timestamps.dt.hour, timestamps.dt.weekday])['pnl'].sum()
+
+    for (hour, weekday), pnl in expected.items():
+        assert tables['hour_weekday'].iloc[hour, weekday] == pytest.approx(pnl)
+    assert tables['calendar'].sum().sum() == pytest.approx(trades['pnl'].sum())
+    assert tables['session']['deals'].sum() == len(trades)
+
+# Define a test function for deals without intraday time
+def test_time_pnl_tables_date_only():
+    tables = time_pnl_tables(add_time_buckets(df.drop(columns=['time'])))
+    assert tables['hour_weekday'] is None
+    assert not tables['calendar'].empty
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fx_analytics.rollups import ALL_SYMBOLS
+from fx_analytics.trade_stats import trade_statistics
+
+def make_deals(results):
+    """
+    One opening and one closing deal per (symbol, net P&L) trade, closed in list order.
+    """
+    rows = [{'position_id': 0, 'symbol': None, 'type': 2, 'entry': 0, 'time': 0, 'profit': 1000.0}]
+    for number, (symbol, pnl) in enumerate(results, start=1):
+        rows.append({'position_id': number, 'symbol': symbol, 'type': 0, 'entry': 0, 'time': 2 * number, 'profit': 0.0})
+        rows.append({'position_id': number, 'symbol': symbol, 'type': 1, 'entry': 1, 'time': 2 * number + 1, 'profit': pnl})
+    return pd.DataFrame(rows).assign(date='2023-10-02', swap=0.0, commission=0.0, fee=0.0)
+
+# Define a test function for the statistics per symbol and overall
+def test_trade_statistics():
+    results = [('EURUSD', 10), ('EURUSD', 20), ('XAUUSD', -5), ('EURUSD', -10),
+               ('XAUUSD', -5), ('XAUUSD', 0), ('XAUUSD', -10), ('EURUSD', 30)]
+    stats = trade_statistics(make_deals(results))
+
+    assert list(stats.index) == [ALL_SYMBOLS, 'EURUSD', 'XAUUSD']
+    eurusd = stats.loc['EURUSD']
+    assert eurusd['trades'] == 4 and eurusd['win_rate_%'] == 75
+    assert eurusd['avg_win'] == 20 and eurusd['avg_loss'] == -10
+    assert eurusd['profit_factor'] == 6 and eurusd['expectancy'] == 12.5
+    assert eurusd['max_win_streak'] == 2 and eurusd['max_loss_streak'] == 1
+
+    # the break-even trade ends the losing streak
+    xauusd = stats.loc['XAUUSD']
+    assert xauusd['max_win_streak'] == 0 and xauusd['max_loss_streak'] == 2
+    assert xauusd['profit_factor'] == 0 and np.isnan(xauusd['avg_win'])
+
+    # Overall streaks follow the closing order across symbols
+    overall = stats.loc[ALL_SYMBOLS]
+    assert overall['trades'] == 8 and overall['max_win_streak'] == 2 and overall['max_loss_streak'] == 3
+    assert overall['expectancy'] == pytest.approx(30 / 8)
+
+# Define a test function for open positions
+def test_open_positions_are_skipped():
+    df = make_deals([('EURUSD', 10)])
+    opened = df.iloc[[1]].assign(position_id=99, time=100)
+    stats = trade_statistics(pd.concat([df, opened]))
+
+    assert stats.loc[ALL_SYMBOLS, 'trades'] == 1
+    assert stats.loc['EURUSD', 'profit_factor'] == np.inf
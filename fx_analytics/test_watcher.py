@@ -0,0 +1,67 @@
+import io
+import os
+import pandas as pd
+from fx_analytics.watcher import deal_snapshot, open_deal_tail, refresh_deal_tail
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+df = pd.read_csv(os.path.join(script_dir, 'fx_history.csv'))
+
+def read_rows(rows: pd.DataFrame) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(rows.to_csv(index=False)))
+
+# Define a test function for deals appended to the file
+def test_refresh_reads_appended_rows(tmp_path):
+    path = tmp_path / 'deals.csv'
+    df.iloc[:100].to_csv(path, index=False)
+    state = open_deal_tail(str(path))
+    version, frame = deal_snapshot(state)
+
+    # Nothing changed
+    assert refresh_deal_tail(state) == 0
+
+    # Append rows, the last one only partially written
+    df.iloc[100:150].to_csv(path, mode='a', header=False, index=False)
+    with open(path, 'a') as handle:
+        handle.write('123,456')
+    assert refresh_deal_tail(state) == 50
+    assert deal_snapshot(state)[0] != version
+    # same columns and types as reading the rows at once, and the earlier snapshot is unchanged
+    pd.testing.assert_frame_equal(deal_snapshot(state)[1], read_rows(df.iloc[:150]))
+    assert len(frame) == 100
+
+# Define a test function for a rewritten file
+def test_refresh_reloads_rewritten_file(tmp_path):
+    path = tmp_path / 'deals.csv'
+    df.iloc[:100].to_csv(path, index=False)
+    state = open_deal_tail(str(path))
+
+    df.iloc[200:400].to_csv(path, index=False)
+    assert refresh_deal_tail(state) == -1
+    pd.testing.assert_frame_equal(deal_snapshot(state)[1], read_rows(df.iloc[200:400]))
+
+# Define a test function for a file rewritten with the same size
+def test_refresh_reloads_same_size_rewrite(tmp_path):
+    path = tmp_path / 'deals.csv'
+    df.iloc[:100].to_csv(path, index=False)
+    state = open_deal_tail(str(path))
+
+    # change an early byte only, keeping the size
+    data = path.read_bytes()
+    at = data.index(b'\n') + 1
+    path.write_bytes(data[:at] + (b'7' if data[at:at + 1] != b'7' else b'8') + data[at + 1:])
+    os.utime(path, ns=(state['mtime'] + 1_000_000, state['mtime'] + 1_000_000))
+
+    assert refresh_deal_tail(state) == -1
+    pd.testing.assert_frame_equal(deal_snapshot(state)[1], pd.read_csv(path))
+
+# Define a test function for appended rows keeping the column types of the file
+def test_refresh_keeps_column_types(tmp_path):
+    path = tmp_path / 'deals.csv'
+    rows = df.iloc[:150].assign(comment=['tp'] * 100 + [None] * 50)
+    rows.iloc[:100].to_csv(path, index=False)
+    state = open_deal_tail(str(path))
+
+    # the appended rows have no comments, which alone would parse as floats
+    rows.iloc[100:].to_csv(path, mode='a', header=False, index=False)
+    assert refresh_deal_tail(state) == 50
+    pd.testing.assert_frame_equal(deal_snapshot(state)[1], read_rows(rows))
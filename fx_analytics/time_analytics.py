@@ -0,0 +1,116 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+from fx_analytics import config
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+SESSIONS = [name for name, _ in config.TRADING_SESSIONS]
+
+# session code of every hour of the day
+_SESSION_STARTS = np.array([start for _, start in config.TRADING_SESSIONS])
+_HOUR_TO_SESSION = (np.searchsorted(_SESSION_STARTS, np.arange(24), side='right') - 1).astype('int8')
+
+
+def add_time_buckets(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add integer 'hour' (0-23), 'weekday' (0=Monday) and 'session' bucket columns to deals.
+
+    The buckets are derived from the 'time' column, which may hold datetimes or
+    'YYYY-MM-DD HH:MM:SS' strings. Sessions are defined by config.TRADING_SESSIONS. If the
+    deals only carry a 'date', only the 'weekday' column is added.
+
+    Args:
+        df (pd.DataFrame): Deals with a 'time' or a 'date' column.
+
+    Returns:
+        pd.DataFrame: A copy of df with the bucket columns added.
+
+    Raises:
+        ValueError: If df has neither a 'time' nor a 'date' column.
+    """
+    df = df.copy()
+
+    if 'time' in df.columns and pd.api.types.is_datetime64_any_dtype(df['time']):
+        timestamps = df['time']
+    elif 'time' in df.columns and df['time'].astype(str).str.len().min() > 8:
+        # full 'YYYY-MM-DD HH:MM:SS' strings, as written by data_transformation
+        timestamps = pd.to_datetime(df['time'], format='ISO8601')
+    elif 'date' in df.columns:
+        df['weekday'] = pd.to_datetime(df['date']).dt.weekday.astype('int8')
+        return df
+    else:
+        raise ValueError("Input DataFrame does not contain a 'time' or 'date' column")
+
+    df['hour'] = timestamps.dt.hour.astype('int8')
+    df['weekday'] = timestamps.dt.weekday.astype('int8')
+    df['session'] = _HOUR_TO_SESSION[df['hour'].to_numpy()]
+
+    return df
+
+
+def time_pnl_tables(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Compute the calendar P&L heatmap and the hour x weekday P&L matrix in one vectorized pass.
+
+    Every non-deposit deal is mapped to a flat bucket code (week x weekday for the calendar,
+    hour x weekday for the matrix) and profit is summed with a single `np.bincount` per table,
+    instead of grouping on datetime objects.
+
+    Args:
+        df (pd.DataFrame): Deals with 'date', 'type', 'profit', 'swap', 'commission' and 'fee'
+                           columns, plus the bucket columns of `add_time_buckets`.
+
+    Returns:
+        Dict[str, pd.DataFrame]: 'calendar' (one row per week, indexed by the week's Monday,
+                                 one column per weekday; NaN for days without deals), 'hour_weekday'
+                                 (24 rows x 7 weekday columns, or None without an 'hour' column)
+                                 and 'session' (profit and deal count per trading session, or None).
+
+    Example:
+        >>> tables = time_pnl_tables(add_time_buckets(df))
+        >>> tables['hour_weekday'].loc[14, 'Tue']
+    """
+    trades = df.loc[df['type'] != 2]
+    pnl = (trades['profit'] + trades['swap'] + trades['commission'] + trades['fee']).to_numpy()
+    # aggregated deals (bounded-memory mode) carry the number of deals per row
+    deal_counts = trades['deals'].to_numpy() if 'deals' in trades.columns else None
+
+    if trades.empty:
+        return {'calendar': pd.DataFrame(columns=WEEKDAYS), 'hour_weekday': None, 'session': None}
+
+    # Calendar: days since the Monday before the first deal, split into week and weekday
+    days = pd.to_datetime(trades['date']).to_numpy().astype('datetime64[D]')
+    first_monday = days.min() - np.timedelta64(int(pd.Timestamp(days.min()).weekday()), 'D')
+    day_codes = (days - first_monday).astype(np.int64)
+    n_weeks = int(day_codes.max()) // 7 + 1
+
+    calendar_pnl = np.bincount(day_codes, weights=pnl, minlength=n_weeks * 7)
+    calendar_deals = np.bincount(day_codes, minlength=n_weeks * 7)
+    calendar = np.where(calendar_deals > 0, calendar_pnl, np.nan).reshape(n_weeks, 7)
+    weeks = pd.DatetimeIndex(first_monday + np.arange(n_weeks) * np.timedelta64(7, 'D'), name='week')
+
+    tables = {'calendar': pd.DataFrame(calendar, index=weeks, columns=WEEKDAYS),
+              'hour_weekday': None,
+              'session': None}
+
+    if 'hour' in trades.columns:
+        # deals of a store mixing old and new segments may have no hour bucket
+        known = trades['hour'].notna().to_numpy()
+        if not known.all():
+            trades, pnl = trades.loc[known], pnl[known]
+            deal_counts = None if deal_counts is None else deal_counts[known]
+
+        # Hour x weekday matrix
+        hour_codes = trades['hour'].to_numpy(np.int64) * 7 + trades['weekday'].to_numpy(np.int64)
+        matrix = np.bincount(hour_codes, weights=pnl, minlength=24 * 7).reshape(24, 7)
+        tables['hour_weekday'] = pd.DataFrame(matrix, index=pd.RangeIndex(24, name='hour'), columns=WEEKDAYS)
+
+        # Profit and deal count per trading session
+        session_codes = trades['session'].to_numpy(np.int64)
+        tables['session'] = pd.DataFrame({
+            'session': SESSIONS,
+            'profit': np.bincount(session_codes, weights=pnl, minlength=len(SESSIONS)),
+            'deals': np.bincount(session_codes, weights=deal_counts, minlength=len(SESSIONS)).astype(np.int64),
+        })
+
+    return tables
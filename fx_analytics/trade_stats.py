@@ -0,0 +1,123 @@
+"""
+Trade-quality statistics per symbol and over all symbols.
+
+Deals are grouped by 'position_id' once into closed trades with their net P&L. Win rate,
+average win/loss, profit factor and expectancy are grouped sums over those trades, and the
+longest win/loss streaks come from a run-length encoding of the trade outcomes in closing
+order, so nothing iterates over positions.
+"""
+import numpy as np
+import pandas as pd
+from fx_analytics.rollups import ALL_SYMBOLS
+
+# deal entries that close (part of) a position: out, in/out (reversal), out by
+CLOSING_ENTRIES = [1, 2, 3]
+
+STAT_COLUMNS = ['trades', 'wins', 'losses', 'win_rate_%', 'avg_win', 'avg_loss', 'profit_factor',
+                'expectancy', 'max_win_streak', 'max_loss_streak']
+
+
+def closed_trades(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Group the deals into closed trades, one row per 'position_id'.
+
+    Args:
+        df (pd.DataFrame): The deals, with 'type', 'position_id', 'symbol', 'date', 'profit',
+                           'swap', 'commission' and 'fee' columns, and optionally 'time' and 'entry'.
+
+    Returns:
+        pd.DataFrame: 'position_id', 'symbol', 'closed' (time of the last deal) and 'pnl' (net
+                      P&L) of every closed position, in closing order.
+    """
+    deals = df.loc[df['type'] != 2]
+    order_column = 'time' if 'time' in deals.columns else 'date'
+
+    trades = pd.DataFrame({
+        'position_id': deals['position_id'],
+        'symbol': deals['symbol'].fillna(''),
+        'closed': deals[order_column],
+        'pnl': deals['profit'] + deals['swap'] + deals['commission'] + deals['fee'],
+        'closing': deals['entry'].isin(CLOSING_ENTRIES) if 'entry' in deals.columns else True,
+    }).groupby('position_id').agg(symbol=('symbol', 'first'), closed=('closed', 'max'),
+                                  pnl=('pnl', 'sum'), closing=('closing', 'any'))
+
+    # Open positions have no result yet
+    trades = trades.loc[trades['closing']].drop(columns='closing')
+    return trades.sort_values('closed', kind='stable').reset_index()
+
+
+def _longest_streaks(keys: np.ndarray, outcome: np.ndarray) -> pd.DataFrame:
+    """
+    Return the longest run of wins (outcome 1) and losses (outcome -1) per key.
+
+    Runs are found by run-length encoding: a run starts wherever the outcome or the key changes,
+    so rows of one key must be contiguous and in closing order.
+    """
+    starts = np.flatnonzero(np.r_[True, (outcome[1:] != outcome[:-1]) | (keys[1:] != keys[:-1])])
+    lengths = np.diff(np.r_[starts, len(outcome)])
+
+    runs = pd.DataFrame({'key': keys[starts], 'outcome': outcome[starts], 'length': lengths})
+    longest = runs.groupby(['key', 'outcome'])['length'].max().unstack(fill_value=0).reindex(columns=[1, -1], fill_value=0)
+    return longest.rename(columns={1: 'max_win_streak', -1: 'max_loss_streak'})
+
+
+def _summarize(keys: np.ndarray, pnl: np.ndarray) -> pd.DataFrame:
+    """
+    Compute the trade statistics per key in one grouped pass over the trades.
+    """
+    outcome = np.sign(pnl).astype(np.int8)
+    grouped = pd.DataFrame({
+        'key': keys,
+        'trades': 1,
+        'wins': outcome == 1,
+        'losses': outcome == -1,
+        'gross_profit': np.where(outcome == 1, pnl, 0.0),
+        'gross_loss': np.where(outcome == -1, -pnl, 0.0),
+    }).groupby('key').sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats = pd.DataFrame({
+            'trades': grouped['trades'],
+            'wins': grouped['wins'],
+            'losses': grouped['losses'],
+            'win_rate_%': grouped['wins'] / grouped['trades'] * 100,
+            'avg_win': grouped['gross_profit'] / grouped['wins'],
+            'avg_loss': -grouped['gross_loss'] / grouped['losses'],
+            'profit_factor': grouped['gross_profit'] / grouped['gross_loss'],
+            'expectancy': (grouped['gross_profit'] - grouped['gross_loss']) / grouped['trades'],
+        })
+
+    return stats.join(_longest_streaks(keys, outcome))
+
+
+def trade_statistics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute win rate, average win/loss, profit factor, expectancy and the longest win/loss
+    streaks per symbol and over all symbols.
+
+    Break-even trades count as trades but neither as wins nor losses, and they end a streak.
+
+    Args:
+        df (pd.DataFrame): The deals, see `closed_trades`.
+
+    Returns:
+        pd.DataFrame: One row per symbol, indexed by symbol with ALL_SYMBOLS first, with the
+                      STAT_COLUMNS. 'profit_factor' is inf for symbols without losing trades.
+
+    Example:
+        >>> trade_statistics(df).loc[ALL_SYMBOLS, 'win_rate_%']
+    """
+    trades = closed_trades(df)
+    if trades.empty:
+        return pd.DataFrame(columns=STAT_COLUMNS, index=pd.Index([], name='symbol'))
+
+    # Per symbol: trades of a symbol contiguous, each in closing order
+    by_symbol = trades.sort_values('symbol', kind='stable')
+    per_symbol = _summarize(by_symbol['symbol'].to_numpy(), by_symbol['pnl'].to_numpy())
+
+    overall = _summarize(np.full(len(trades), ALL_SYMBOLS, dtype=object), trades['pnl'].to_numpy())
+
+    stats = pd.concat([overall, per_symbol])[STAT_COLUMNS]
+    stats.index.name = 'symbol'
+    return stats
+
@@ -0,0 +1,141 @@
+"""
+Tail-reading watcher for the deal file.
+
+The watcher state remembers the byte offset up to which the file has been parsed. When the
+ETL appends deals, `refresh_deal_tail` parses only the bytes after that offset and appends
+the rows to the cached DataFrame. If the file was truncated or rewritten, it is reloaded.
+
+The parsed deals and their version are published together as one 'snapshot' tuple, so a
+reader never pairs a version with the deals of another version.
+"""
+import io
+import os
+import threading
+from typing import Dict, Tuple
+import pandas as pd
+from loguru import logger
+
+# number of bytes before the offset used to detect a rewritten file
+_FINGERPRINT_SIZE = 256
+
+
+def _complete_lines(data: bytes) -> bytes:
+    """
+    Drop a trailing partial line that is still being written.
+    """
+    return data[:data.rfind(b'\n') + 1]
+
+
+def _fingerprint(handle, offset: int) -> bytes:
+    """
+    Return the bytes just before the offset.
+    """
+    start = max(0, offset - _FINGERPRINT_SIZE)
+    handle.seek(start)
+    return handle.read(offset - start)
+
+
+def open_deal_tail(data_file_path: str) -> Dict:
+    """
+    Read the deal file and create the watcher state.
+
+    Args:
+        data_file_path (str): Path to the deal file written by the ETL.
+
+    Returns:
+        Dict: The watcher state with the parsed byte 'offset' and the 'snapshot' of the
+              deals, see `deal_snapshot`.
+    """
+    state = {'path': data_file_path, 'lock': threading.Lock()}
+    _load(state)
+    return state
+
+
+def _load(state: Dict) -> None:
+    """
+    (Re)load the whole file into the state.
+    """
+    with open(state['path'], 'rb') as handle:
+        data = _complete_lines(handle.read())
+        generation = os.fstat(handle.fileno()).st_mtime_ns
+        state['mtime'] = generation
+
+        frame = pd.read_csv(io.BytesIO(data))
+        state['offset'] = len(data)
+        state['fingerprint'] = _fingerprint(handle, len(data))
+
+    # the generation tells reloads apart, the offset tells appends apart
+    state['generation'] = generation
+    state['dtypes'] = frame.dtypes.to_dict()
+    state['snapshot'] = (f"{generation}-{state['offset']}", frame)
+    logger.info("Loaded {} deals from {}", len(frame), state['path'])
+
+
+def deal_snapshot(state: Dict) -> Tuple[str, pd.DataFrame]:
+    """
+    Return the current data version and the deals of that version.
+
+    The DataFrame is replaced, never modified, when deals are appended, so it stays valid
+    after later refreshes and must not be modified in place.
+
+    Example:
+        >>> version, df = deal_snapshot(open_deal_tail('fx_history.csv'))
+    """
+    return state['snapshot']
+
+
+def _cast_like(appended: pd.DataFrame, dtypes: Dict) -> pd.DataFrame:
+    """
+    Cast appended rows to the column types of the loaded file, so e.g. a chunk without text
+    in a column does not turn it into floats. Columns that cannot be cast (missing values in
+    an integer column) are left to the upcasting of `pd.concat`, as a full reload would.
+    """
+    for column, dtype in dtypes.items():
+        try:
+            appended[column] = appended[column].astype(dtype)
+        except (TypeError, ValueError):
+            pass
+    return appended
+
+
+def refresh_deal_tail(state: Dict) -> int:
+    """
+    Merge deals appended to the file since the last refresh into the state.
+
+    Only the bytes after the stored offset are parsed. A file that shrank or whose bytes
+    before the offset changed is reloaded completely, also when its size did not change.
+
+    Args:
+        state (Dict): The watcher state created by `open_deal_tail`.
+
+    Returns:
+        int: The number of new rows, or -1 if the file was reloaded.
+    """
+    with state['lock']:
+        with open(state['path'], 'rb') as handle:
+            stat = os.fstat(handle.fileno())
+            # nothing after the offset but a new modification time: rewritten with the same size
+            rewritten = stat.st_size < state['offset'] or \
+                (stat.st_size == state['offset'] and stat.st_mtime_ns != state['mtime']) or \
+                _fingerprint(handle, state['offset']) != state['fingerprint']
+
+            if not rewritten:
+                handle.seek(state['offset'])
+                data = _complete_lines(handle.read())
+                if not data:
+                    return 0
+
+                appended = pd.read_csv(io.BytesIO(data), header=None, names=list(state['dtypes']))
+                appended = _cast_like(appended, state['dtypes'])
+                frame = pd.concat([state['snapshot'][1], appended], ignore_index=True)
+                state['offset'] += len(data)
+                state['fingerprint'] = _fingerprint(handle, state['offset'])
+                state['mtime'] = stat.st_mtime_ns
+                state['snapshot'] = (f"{state['generation']}-{state['offset']}", frame)
+
+                logger.info("Appended {} new deals from {}", len(appended), state['path'])
+                return len(appended)
+
+        logger.info("{} was rewritten, reloading", state['path'])
+        _load(state)
+        return -1
@@ -16,7 +16,7 @@ setup(
     license= "MIT",
     extras_require = {"dev":["pytest","twine"],},
     install_requires=['pandas>=2.1.0',
-                        'streamlit>=1.26.0',
+                        'streamlit>=1.37.0',
                         'plotly>=5.16.1',
                         'plotly-express>=0.4.1',
                         'loguru>=0.7.2',